@@ -1,39 +1,13 @@
 import os
-import json
 from pathlib import Path
 from dotenv import load_dotenv
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 DOTENV_PATH = BASE_DIR / '.env'
 
-# #region agent log
-try:
-    from pathlib import Path as _Path
-    LOG_DIR = _Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-    LOG_FILE = LOG_DIR / 'debug.log'
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    env_file_exists = DOTENV_PATH.exists()
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"B","location":"settings.py:12","message":"Checking .env file existence","data":{"env_file_exists":env_file_exists,"env_path":str(DOTENV_PATH)}, "timestamp":int(__import__('time').time()*1000)})+'\n')
-except:
-    pass
-# #endregion
-
 # Always load .env from project root (works even if runserver started elsewhere)
 load_dotenv(dotenv_path=DOTENV_PATH)
 
-# #region agent log
-try:
-    from pathlib import Path as _Path
-    LOG_DIR = _Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-    LOG_FILE = LOG_DIR / 'debug.log'
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"B","location":"settings.py:25","message":"load_dotenv executed","data":{"dotenv_path":str(DOTENV_PATH)}, "timestamp":int(__import__('time').time()*1000)})+'\n')
-except:
-    pass
-# #endregion
-
 SECRET_KEY = 'replace-this-in-production'
 
 DEBUG = True
@@ -43,17 +17,6 @@ ALLOWED_HOSTS = []
 # Gemini API Configuration
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
 
-# #region agent log
-try:
-    from pathlib import Path as _Path
-    LOG_DIR = _Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-    LOG_FILE = LOG_DIR / 'debug.log'
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"A","location":"settings.py:35","message":"GEMINI_API_KEY loaded from environment","data":{"api_key_length":len(GEMINI_API_KEY) if GEMINI_API_KEY else 0,"api_key_empty":not bool(GEMINI_API_KEY),"api_key_preview":GEMINI_API_KEY[:10]+"..." if GEMINI_API_KEY and len(GEMINI_API_KEY) > 10 else GEMINI_API_KEY},"timestamp":int(__import__('time').time()*1000)})+'\n')
-except: pass
-# #endregion
-
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -65,6 +28,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'events.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -93,6 +57,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'book_my_event.wsgi.application'
+ASGI_APPLICATION = 'book_my_event.asgi.application'
 
 DATABASES = {
     'default': {
@@ -101,6 +66,35 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Chatbot answers: LRU eviction one entry at a time once MAX_ENTRIES is hit.
+    'chatbot': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'chatbot-answers',
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {'MAX_ENTRIES': 2000, 'CULL_FREQUENCY': 2000},
+    },
+}
+
+CHATBOT_CACHE_ALIAS = 'chatbot'
+CHATBOT_CACHE_TIMEOUT = 60 * 60
+# Longest a chatbot request waits for Gemini before answering from the local FAQ.
+CHATBOT_DEADLINE_SECONDS = float(os.getenv('CHATBOT_DEADLINE_SECONDS', '15'))
+
+# Token buckets for the chatbot API (see events/throttle.py): one per session
+# and a looser one per client IP, since many users can share an address.
+CHATBOT_RATE_LIMIT = {
+    'ENABLED': os.getenv('CHATBOT_RATE_LIMIT_ENABLED', '1') == '1',
+    'BURST': 10,
+    'PER_MINUTE': 6,
+    'IP_BURST': 60,
+    'IP_PER_MINUTE': 30,
+    'CACHE_ALIAS': 'default',
+}
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = 'en-us'
@@ -119,3 +113,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Email - default to console backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+
+# Structured telemetry (see events/telemetry.py). Records are queued in memory
+# and written in batches by a background thread.
+TELEMETRY = {
+    'ENABLED': os.getenv('TELEMETRY_ENABLED', '1') == '1',
+    'LEVEL': os.getenv('TELEMETRY_LEVEL', 'info'),
+    'SAMPLE_RATE': float(os.getenv('TELEMETRY_SAMPLE_RATE', '1.0')),
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'SINK': os.getenv('TELEMETRY_SINK', 'jsonl'),
+    'PATH': BASE_DIR / 'logs' / 'telemetry.jsonl',
+}
+
+# Per-request profiling (see events/profiling.py): Server-Timing headers with
+# DB, template and LLM time. Off by default; the middleware then unloads itself.
+PROFILING = {
+    'ENABLED': os.getenv('PROFILING_ENABLED', '0') == '1',
+    'SERVER_TIMING': True,
+    'SAMPLE_RATE': float(os.getenv('PROFILING_SAMPLE_RATE', '0.0')),
+}
@@ -1,13 +1,79 @@
+from django import forms
 from django.contrib import admin
-from .models import Event, Registration, Profile, Wishlist, Testimonial, Review
+from . import booking, reviews
+from .models import Event, Registration, Profile, Wishlist, Testimonial, Review, OutboundEmail
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'date', 'location', 'organiser')
     prepopulated_fields = {"slug": ("title",)}
+    # The counters are maintained by events.booking and events.reviews, and a
+    # form save would overwrite concurrent updates; geohash is derived from
+    # the coordinates.
+    readonly_fields = ('seats_taken', 'rating_sum', 'rating_count', 'geohash')
+
+
+class RegistrationAdminForm(forms.ModelForm):
+    class Meta:
+        model = Registration
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        event = cleaned_data.get('event')
+        if self.instance.pk is None and event is not None and event.is_sold_out:
+            raise forms.ValidationError('This event is sold out.')
+        return cleaned_data
+
+
+@admin.register(Registration)
+class RegistrationAdmin(admin.ModelAdmin):
+    # Route writes through events.booking so Event.seats_taken stays in step;
+    # deletes give seats back in signals.py.
+    form = RegistrationAdminForm
+    list_display = ('__str__', 'event', 'cancelled', 'created_at')
+    list_filter = ('cancelled',)
+    actions = ['cancel_registrations']
+
+    def get_readonly_fields(self, request, obj=None):
+        if obj is None:
+            return ('cancelled',)
+        return ('user', 'event', 'cancelled')
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            obj.save()
+        else:
+            booking.register(obj)
+
+    @admin.action(description='Cancel selected registrations')
+    def cancel_registrations(self, request, queryset):
+        cancelled = sum(booking.cancel(registration) for registration in queryset.filter(cancelled=False))
+        self.message_user(request, f'Cancelled {cancelled} registrations.')
 
-admin.site.register(Registration)
 admin.site.register(Profile)
 admin.site.register(Wishlist)
 admin.site.register(Testimonial)
-admin.site.register(Review)
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'to', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('to', 'subject')
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    # Route writes through events.reviews so Event rating totals stay in step.
+    list_display = ('event', 'user', 'rating', 'created_at')
+
+    def save_model(self, request, obj, form, change):
+        reviews.save(obj)
+
+    def delete_model(self, request, obj):
+        reviews.delete(obj)
+
+    def delete_queryset(self, request, queryset):
+        for review in queryset:
+            reviews.delete(review)
@@ -0,0 +1,46 @@
+"""Audience queries over profile interests and city.
+
+"Attendees in Pune interested in tech or music" becomes::
+
+    WHERE city_key = 'pune' AND interest_mask IN (<masks with either bit>)
+
+which ``profile_city_interest_idx`` answers on its own. Without a city the
+``profile_interest_idx`` index serves the mask condition.
+
+    audience.count(city='Pune', any_of=['tech', 'music'])
+    for user_id, email in audience.iter_recipients(city='Pune', any_of=['tech']):
+        ...
+"""
+from .interests import ALL_MASKS, city_key, masks_matching
+from .models import Profile
+
+CHUNK_SIZE = 2000
+
+
+def profiles(city=None, any_of=None, all_of=None, role=None):
+    """Profiles in ``city`` (any spelling of it) with the given interests.
+
+    ``any_of`` matches profiles with at least one of the categories, and
+    ``all_of`` matches profiles with every one of them. Both take a list or a
+    comma-separated string, in any case; unknown categories raise ValueError.
+    """
+    qs = Profile.objects.all()
+    if city:
+        qs = qs.filter(city_key=city_key(city))
+    if any_of or all_of:
+        masks = masks_matching(any_of, all_of)
+        if len(masks) < len(ALL_MASKS):
+            qs = qs.filter(interest_mask__in=masks)
+    if role:
+        qs = qs.filter(role=role)
+    return qs
+
+
+def count(**filters):
+    return profiles(**filters).count()
+
+
+def iter_recipients(chunk_size=CHUNK_SIZE, **filters):
+    """Yield (user_id, email) pairs for notification jobs, reading in chunks."""
+    rows = profiles(**filters).order_by('pk').values_list('user_id', 'user__email')
+    return rows.iterator(chunk_size=chunk_size)
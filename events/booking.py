@@ -0,0 +1,94 @@
+"""Seat allocation for event registrations.
+
+Seats are claimed with a single conditional UPDATE on ``Event.seats_taken``
+(``seats_taken < capacity``), so concurrent registrations can never oversell
+and no row is held locked longer than that one statement plus the insert.
+Duplicate active registrations are rejected by the
+``unique_active_registration`` constraint rather than a read-then-write check.
+
+Registrations are created and cancelled through ``register`` and ``cancel``
+here (the admin does too); deleting an active registration gives its seat
+back (see signals.py). ``rebuild`` recounts the counters from the
+registrations table and ``drift`` lists events whose counter disagrees with it.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Event, Registration
+
+
+class RegistrationError(Exception):
+    pass
+
+
+class SoldOut(RegistrationError):
+    pass
+
+
+class AlreadyRegistered(RegistrationError):
+    pass
+
+
+def claim_seat(event_id):
+    """Atomically take one seat. Returns False when the event is full."""
+    has_room = Q(capacity__lte=0) | Q(seats_taken__lt=F('capacity'))
+    updated = Event.objects.filter(pk=event_id).filter(has_room).update(seats_taken=F('seats_taken') + 1)
+    return updated == 1
+
+
+def release_seat(event_id):
+    Event.objects.filter(pk=event_id, seats_taken__gt=0).update(seats_taken=F('seats_taken') - 1)
+
+
+def register(registration):
+    """Save an unsaved Registration (user and event set) and claim its seat.
+
+    Raises SoldOut or AlreadyRegistered; in both cases nothing is written.
+    """
+    try:
+        with transaction.atomic():
+            # Insert first: a duplicate fails on the constraint before the
+            # event row is touched, keeping the counter's lock window short.
+            registration.save()
+            if not claim_seat(registration.event_id):
+                raise SoldOut()
+    except IntegrityError:
+        registration.pk = None
+        raise AlreadyRegistered()
+    except SoldOut:
+        registration.pk = None
+        raise
+    return registration
+
+
+def cancel(registration):
+    """Cancel an active registration and give its seat back."""
+    with transaction.atomic():
+        updated = Registration.objects.filter(pk=registration.pk, cancelled=False).update(cancelled=True)
+        if updated:
+            release_seat(registration.event_id)
+    registration.cancelled = True
+    return bool(updated)
+
+
+def _active_count():
+    active = Registration.objects.filter(event=OuterRef('pk'), cancelled=False).order_by().values('event')
+    return Coalesce(Subquery(active.annotate(n=Count('pk')).values('n')), Value(0))
+
+
+def rebuild(queryset=None):
+    """Recount ``seats_taken`` of ``queryset`` (default: all events) from active registrations."""
+    queryset = Event.objects.all() if queryset is None else queryset
+    return queryset.update(seats_taken=_active_count())
+
+
+def drift(queryset=None):
+    """Events whose ``seats_taken`` differs from their active registrations, as dicts."""
+    queryset = Event.objects.all() if queryset is None else queryset
+    return (
+        queryset.annotate(actual=_active_count())
+        .filter(~Q(seats_taken=F('actual')))
+        .values('pk', 'capacity', 'seats_taken', 'actual')
+        .order_by('pk')
+    )
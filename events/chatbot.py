@@ -1,6 +1,7 @@
 import os
-import json
-from pathlib import Path
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
 from dotenv import load_dotenv
 import google.generativeai as genai
@@ -8,41 +9,17 @@ from django.conf import settings
 
 from book_my_event.settings import GEMINI_API_KEY
 
-# Ensure log directory exists
-LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-LOG_FILE = LOG_DIR / 'debug.log'
-LOG_DIR.mkdir(parents=True, exist_ok=True)
+from . import profiling, retrieval, telemetry
+from .chatbot_cache import ResponseCache, SingleFlight
+from .chatbot_faq import FaqResponder
+from .chatbot_memory import Conversation
 
-# #region agent log
-try:
-    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-        f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"A","location":"chatbot.py:15","message":"Before genai.configure() call","data":{"api_key_received":bool(GEMINI_API_KEY),"api_key_length":len(GEMINI_API_KEY) if GEMINI_API_KEY else 0,"api_key_empty":not bool(GEMINI_API_KEY)},"timestamp":int(__import__('time').time()*1000)})+'\n')
-except: pass
-# #endregion
 
 # Configure Gemini API
 try:
-    # #region agent log
-    try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"D","location":"chatbot.py:28","message":"Attempting genai.configure()","data":{"api_key_provided":bool(GEMINI_API_KEY)},"timestamp":int(__import__('time').time()*1000)})+'\n')
-    except: pass
-    # #endregion
     if GEMINI_API_KEY:
         genai.configure(api_key=GEMINI_API_KEY)
-    # #region agent log
-    try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"D","location":"chatbot.py:33","message":"genai.configure() succeeded","data":{},"timestamp":int(__import__('time').time()*1000)})+'\n')
-    except: pass
-    # #endregion
 except Exception as e:
-    # #region agent log
-    try:
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"D","location":"chatbot.py:38","message":"genai.configure() failed","data":{"error":str(e),"error_type":type(e).__name__},"timestamp":int(__import__('time').time()*1000)})+'\n')
-    except: pass
-    # #endregion
     pass  # Will be handled when chatbot is used
 
 # System prompt for the chatbot
@@ -66,198 +43,449 @@ Website Features:
 - Event filtering by date and location
 
 Keep responses brief (2-3 sentences max for initial responses, more detailed if they ask follow-up questions).
+
+When a list of upcoming events from the site is included below, answer questions about events from that list only
+and include each recommended event's link. Never invent events, dates or venues; if nothing in the list fits,
+say so and suggest browsing /events/.
 """
 
-class EventsChatbot:
-    def __init__(self):
-        # #region agent log
-        try:
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"G","location":"chatbot.py:68","message":"EventsChatbot.__init__","data":{"api_key_available":bool(GEMINI_API_KEY)}, "timestamp":int(__import__('time').time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
-        # List available models and use the first one that supports generateContent
+# How long a resolved model is reused before list_models() is consulted again,
+# and how many consecutive failed calls force an early re-resolution.
+MODEL_TTL_SECONDS = 60 * 60
+MODEL_MAX_FAILURES = 3
+FALLBACK_MODELS = ['gemini-2.5-flash', 'gemini-2.0-flash', 'gemini-pro']
+
+# Gemini calls run on a bounded pool, so a hung call ties up a pool thread
+# rather than a request worker. The request stops waiting at its deadline
+# (settings.CHATBOT_DEADLINE_SECONDS), and the call itself is made with that
+# timeout and no client retries, so the pool thread is freed soon after.
+LLM_MAX_CONCURRENT_CALLS = 16
+# Consecutive failures or timeouts that open the circuit breaker, and how long
+# it stays open before a trial call is let through.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+CUT_SHORT_MESSAGE = " … Sorry, the answer was cut short. Please try again."
+
+MISSING_KEY_MESSAGE = "Sorry, I encountered an error: No API_KEY or ADC found. Please either: - Set the `GOOGLE_API_KEY` environment variable. - Manually pass the key with `genai.configure(api_key=my_api_key)`. - Or set up Application Default Credentials, see https://ai.google.dev/gemini-api/docs/oauth for more information.. Please try again later."
+
+
+def build_prompt(user_message, context='', history=''):
+    sections = [SYSTEM_PROMPT, context, history, f"User: {user_message}"]
+    return '\n\n'.join(section for section in sections if section)
+
+
+def retrieve_context(user_message, previous=''):
+    """Events relevant to the question, for the prompt; '' if retrieval fails."""
+    try:
+        with profiling.span('retrieval'):
+            return retrieval.context_for(user_message, previous=previous)
+    except Exception as e:
+        telemetry.emit('chatbot.retrieval_failed', level='warning', error=str(e), error_type=type(e).__name__)
+        return ''
+
+
+def error_message(e):
+    """User-facing text for an exception raised while talking to Gemini"""
+    # Check if it's an API key error from Gemini
+    error_str = str(e).lower()
+    if 'api_key' in error_str or 'api key' in error_str or 'no api_key' in error_str or 'adc' in error_str:
+        return f"Sorry, I encountered an error: {str(e)}. Please check your GEMINI_API_KEY in the .env file. Get a valid key from https://makersuite.google.com/app/apikey"
+    return f"Sorry, I encountered an error: {str(e)}. Please try again later."
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+_llm_pool = ThreadPoolExecutor(max_workers=LLM_MAX_CONCURRENT_CALLS, thread_name_prefix='gemini')
+
+
+def call_with_deadline(timeout, fn, *args, **kwargs):
+    """Run ``fn`` on the Gemini call pool, waiting at most ``timeout`` seconds.
+
+    A call that misses the deadline is abandoned: the caller gets
+    ``DeadlineExceeded`` and the pool thread is freed when the call returns,
+    which for Gemini calls their own timeout bounds (see ``_call_model``).
+    """
+    future = _llm_pool.submit(fn, *args, **kwargs)
+    try:
+        return future.result(timeout=max(timeout, 0))
+    except FutureTimeout:
+        future.cancel()  # Still queued behind hung calls: never start it.
+        raise DeadlineExceeded(f'Gemini did not answer within {timeout:.1f}s') from None
+
+
+class CircuitBreaker:
+    """Process-wide switch that stops calling Gemini while it keeps failing.
+
+    Closed, every call goes through. ``failure_threshold`` consecutive
+    failures or timeouts open it, and for ``reset_timeout`` seconds no call
+    is made: the chatbot answers from the local FAQ instead. Then it is
+    half-open: one trial call goes through, and its outcome closes the breaker
+    or opens it again. ``stats()`` is for metrics; every state change is also
+    emitted as a ``chatbot.circuit`` telemetry record.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_SECONDS,
+                 clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self.opened = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _set_state(self, state):
+        self._state = state
+        level = 'warning' if state == self.OPEN else 'info'
+        telemetry.emit('chatbot.circuit', level=level, state=state, consecutive_failures=self._failures)
+
+    @property
+    def state(self):
+        return self._state
+
+    def allow(self):
+        """Whether a Gemini call may be made now. Callers must report its outcome."""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                self._set_state(self.HALF_OPEN)
+            if self._state == self.HALF_OPEN:
+                if self._trial_running:
+                    self.rejected += 1
+                    return False
+                self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            if self._state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self, timeout=False):
+        with self._lock:
+            self._failures += 1
+            if timeout:
+                self.timeouts += 1
+            if self._state == self.HALF_OPEN or (
+                    self._state == self.CLOSED and self._failures >= self.failure_threshold):
+                self._trial_running = False
+                self._opened_at = self._clock()
+                self.opened += 1
+                self._set_state(self.OPEN)
+
+    def release(self):
+        """The allowed call ended without an outcome, e.g. the client went away.
+
+        The state is left as it is, but another trial call may now be made.
+        """
+        with self._lock:
+            self._trial_running = False
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            if self._state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def stats(self):
+        with self._lock:
+            retry_in = 0.0
+            if self._state == self.OPEN:
+                retry_in = max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+            return {
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'opened': self.opened,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'retry_in': round(retry_in, 1),
+            }
+
+
+class ModelRegistry:
+    """Process-wide, thread-safe holder for the resolved Gemini model.
+
+    Resolving a model costs a ``list_models()`` round trip, so it is done once
+    and shared by every request. The model is re-resolved after ``ttl``
+    seconds, or after ``max_failures`` consecutive failed calls.
+    """
+
+    def __init__(self, ttl=MODEL_TTL_SECONDS, max_failures=MODEL_MAX_FAILURES, client=None):
+        self.ttl = ttl
+        self.max_failures = max_failures
+        self._client = client
+        self._lock = threading.Lock()
+        self._model = None
+        self._resolved_at = 0.0
+        self._failures = 0
+
+    def _current(self):
+        model = self._model
+        if model is not None and time.monotonic() - self._resolved_at < self.ttl:
+            return model
+        return None
+
+    def get(self):
+        """Return the shared model, resolving it first if needed."""
+        model = self._current()
+        if model is not None:
+            return model
+        with self._lock:
+            # Another thread may have resolved it while we waited.
+            model = self._current()
+            if model is None:
+                model = self._resolve()
+                self._model = model
+                self._resolved_at = time.monotonic()
+                self._failures = 0
+            return model
+
+    def invalidate(self):
+        with self._lock:
+            self._model = None
+
+    def report_success(self):
+        with self._lock:
+            self._failures = 0
+
+    def report_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.max_failures:
+                self._model = None
+                self._failures = 0
+
+    def _resolve(self):
+        client = self._client or genai
+        # List available models that support generateContent
+        available_models = []
         try:
-            # #region agent log
-            try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run7","hypothesisId":"H","location":"chatbot.py:80","message":"Listing available models","data":{},"timestamp":int(__import__('time').time()*1000)})+'\n')
-            except:
-                pass
-            # #endregion
-            
-            # List available models that support generateContent
-            available_models = []
-            try:
-                for model in genai.list_models():
+            with profiling.span('llm_models'):
+                for model in client.list_models():
                     if 'generateContent' in model.supported_generation_methods:
                         available_models.append(model.name)
-                # #region agent log
-                try:
-                    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                        f.write(json.dumps({"sessionId":"debug-session","runId":"run7","hypothesisId":"H","location":"chatbot.py:90","message":"Available models found","data":{"models":available_models[:5]},"timestamp":int(__import__('time').time()*1000)})+'\n')
-                except:
-                    pass
-                # #endregion
-            except Exception as list_err:
-                # #region agent log
-                try:
-                    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                        f.write(json.dumps({"sessionId":"debug-session","runId":"run7","hypothesisId":"H","location":"chatbot.py:97","message":"Could not list models","data":{"error":str(list_err)},"timestamp":int(__import__('time').time()*1000)})+'\n')
-                except:
-                    pass
-                # #endregion
-                pass
-            
-            # Use the first available model, or fallback to common names
-            model_initialized = False
-            
-            # First, try models from the list_models() result
-            if available_models:
-                for model_name in available_models:
-                    try:
-                        # Remove 'models/' prefix if present, GenerativeModel handles it
-                        clean_name = model_name.replace('models/', '')
-                        self.model = genai.GenerativeModel(clean_name)
-                        # #region agent log
-                        try:
-                            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                                f.write(json.dumps({"sessionId":"debug-session","runId":"run7","hypothesisId":"H","location":"chatbot.py:112","message":"Model initialized from available list","data":{"model_name":clean_name,"original_name":model_name},"timestamp":int(__import__('time').time()*1000)})+'\n')
-                        except:
-                            pass
-                        # #endregion
-                        model_initialized = True
-                        break
-                    except Exception as model_err:
-                        # #region agent log
-                        try:
-                            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                                f.write(json.dumps({"sessionId":"debug-session","runId":"run7","hypothesisId":"H","location":"chatbot.py:121","message":"Model from list failed, trying next","data":{"model_name":clean_name,"error":str(model_err)[:100]},"timestamp":int(__import__('time').time()*1000)})+'\n')
-                        except:
-                            pass
-                        # #endregion
-                        continue
-            
-            # If no model from list worked, try common fallback names
-            if not model_initialized:
-                fallback_models = ['gemini-2.5-flash', 'gemini-2.0-flash', 'gemini-pro']
-                for model_name in fallback_models:
-                    try:
-                        self.model = genai.GenerativeModel(model_name)
-                        # #region agent log
-                        try:
-                            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                                f.write(json.dumps({"sessionId":"debug-session","runId":"run7","hypothesisId":"H","location":"chatbot.py:133","message":"Model initialized from fallback","data":{"model_name":model_name},"timestamp":int(__import__('time').time()*1000)})+'\n')
-                        except:
-                            pass
-                        # #endregion
-                        model_initialized = True
-                        break
-                    except Exception as model_err:
-                        continue
-            
-            if not model_initialized:
-                raise Exception(f"No working model found. Available models: {available_models[:3]}")
-        except Exception as e:
-            # #region agent log
+            telemetry.emit('chatbot.models_listed', level='debug', models=available_models[:5])
+        except Exception as list_err:
+            telemetry.emit('chatbot.list_models_failed', level='warning', error=str(list_err))
+
+        # Use the first available model, or fallback to common names.
+        # Remove 'models/' prefix if present, GenerativeModel handles it
+        candidates = [name.replace('models/', '') for name in available_models] + FALLBACK_MODELS
+        for model_name in candidates:
             try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run6","hypothesisId":"H","location":"chatbot.py:128","message":"All model initialization attempts failed","data":{"error":str(e)},"timestamp":int(__import__('time').time()*1000)})+'\n')
-            except:
-                pass
-            # #endregion
-            # Re-raise so we can see the error
-            raise
-        self.conversation_history = []
-    
+                model = client.GenerativeModel(model_name)
+            except Exception as model_err:
+                telemetry.emit('chatbot.model_init_failed', level='debug', model_name=model_name, error=str(model_err)[:100])
+                continue
+            telemetry.emit('chatbot.model_resolved', model_name=model_name)
+            return model
+
+        telemetry.emit('chatbot.model_resolution_failed', level='error', available_models=available_models[:3])
+        raise Exception(f"No working model found. Available models: {available_models[:3]}")
+
+
+model_registry = ModelRegistry()
+response_cache = ResponseCache(SYSTEM_PROMPT)
+inflight = SingleFlight()
+circuit_breaker = CircuitBreaker()
+faq_responder = FaqResponder(SYSTEM_PROMPT)
+
+
+class EventsChatbot:
+    """One chat turn at a time against the shared model.
+
+    ``conversation`` is the visitor's ``Conversation`` (see chatbot_memory.py);
+    the views load it from the session and save it back after each turn. Only
+    opening questions use the response cache, and only they are coalesced
+    in ``flights``, because a follow-up's answer depends on the conversation
+    before it.
+
+    Every Gemini call, including model resolution, must finish within
+    ``deadline`` seconds. While ``breaker`` is open, and for a call that
+    misses its deadline, the answer comes from the local FAQ instead.
+    """
+
+    def __init__(self, registry=None, cache=None, conversation=None, flights=None, breaker=None, deadline=None):
+        self.registry = registry or model_registry
+        self.cache = cache or response_cache
+        self.flights = flights or inflight
+        self.breaker = breaker or circuit_breaker
+        self.deadline = deadline or settings.CHATBOT_DEADLINE_SECONDS
+        self.conversation = conversation if conversation is not None else Conversation()
+
+    @property
+    def model(self):
+        return self.registry.get()
+
+    @property
+    def conversation_history(self):
+        return [{'role': role, 'content': content} for role, content in self.conversation.turns]
+
     def add_message(self, role, content):
         """Add a message to conversation history"""
-        self.conversation_history.append({
-            'role': role,
-            'content': content
-        })
-    
+        self.conversation.add(role, content)
+
+    def _prepare(self, user_message):
+        """(prompt, context, first turn) for ``user_message``."""
+        history = self.conversation.transcript()
+        # Answers depend on the retrieved events, so they are part of the cache key.
+        context = retrieve_context(user_message, self.conversation.last_user_message())
+        return build_prompt(user_message, context, history), context, not history
+
+    def _remember(self, user_message, bot_response):
+        self.add_message('user', user_message)
+        self.add_message('assistant', bot_response)
+
+    def _answer_locally(self, user_message, reason):
+        answer = faq_responder.answer(user_message, self.conversation.last_user_message())
+        telemetry.emit('chatbot.local_answer', reason=reason, circuit=self.breaker.state)
+        self._remember(user_message, answer)
+        return answer
+
+    def _call_model(self, prompt, stream=False):
+        # Resolving the model may call list_models(), so it runs under the deadline too.
+        model = self.registry.get()
+        # The client's default retry policy would keep a failing call going for
+        # minutes after the deadline; the breaker and local FAQ handle failures.
+        request_options = {'timeout': self.deadline, 'retry': None}
+        return model, model.generate_content(prompt, stream=stream, request_options=request_options)
+
+    def _report_failure(self, e):
+        self.registry.report_failure()
+        self.breaker.record_failure(timeout=isinstance(e, DeadlineExceeded))
+
     def get_response(self, user_message):
         """Get chatbot response using Gemini API"""
-        # #region agent log
-        try:
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"A","location":"chatbot.py:95","message":"get_response() called","data":{"user_message_length":len(user_message),"api_key_available":bool(GEMINI_API_KEY)},"timestamp":int(__import__('time').time()*1000)})+'\n')
-        except: pass
-        # #endregion
         try:
             # Check if API key is configured
             if not GEMINI_API_KEY:
-                # #region agent log
-                try:
-                    with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                        f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"A","location":"chatbot.py:102","message":"API key missing in get_response","data":{},"timestamp":int(__import__('time').time()*1000)})+'\n')
-                except: pass
-                # #endregion
-                return "Sorry, I encountered an error: No API_KEY or ADC found. Please either: - Set the `GOOGLE_API_KEY` environment variable. - Manually pass the key with `genai.configure(api_key=my_api_key)`. - Or set up Application Default Credentials, see https://ai.google.dev/gemini-api/docs/oauth for more information.. Please try again later."
-            
-            # Add user message to history
-            self.add_message('user', user_message)
-            
-            # Prepare conversation for API
-            messages = [{'role': msg['role'], 'content': msg['content']} 
-                       for msg in self.conversation_history]
-            
-            # #region agent log
-            try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"E","location":"chatbot.py:115","message":"Before model.generate_content()","data":{},"timestamp":int(__import__('time').time()*1000)})+'\n')
-            except: pass
-            # #endregion
-            
+                telemetry.emit('chatbot.api_key_missing', level='warning')
+                return MISSING_KEY_MESSAGE
+
+            prompt, context, first_turn = self._prepare(user_message)
+            cached = self.cache.get(user_message, context) if first_turn else None
+            if cached is not None:
+                telemetry.emit('chatbot.cache_hit', level='debug')
+                self._remember(user_message, cached)
+                return cached
+
+            if not self.breaker.allow():
+                return self._answer_locally(user_message, 'circuit_open')
+
             # Get response from Gemini
-            # #region agent log
-            try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"E","location":"chatbot.py:138","message":"Calling model.generate_content()","data":{"api_key_configured":bool(GEMINI_API_KEY),"model_name":getattr(self.model, '_model_name', 'unknown')}, "timestamp":int(__import__('time').time()*1000)})+'\n')
-            except: pass
-            # #endregion
-            
-            response = self.model.generate_content(
-                f"{SYSTEM_PROMPT}\n\nUser: {user_message}"
-            )
-            
-            # #region agent log
-            try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"E","location":"chatbot.py:145","message":"model.generate_content() returned","data":{"has_response":bool(response),"has_text":hasattr(response, 'text')}, "timestamp":int(__import__('time').time()*1000)})+'\n')
-            except: pass
-            # #endregion
-            
-            bot_response = response.text
-            
-            # Add bot response to history
-            self.add_message('assistant', bot_response)
-            
-            # #region agent log
-            try:
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run3","hypothesisId":"E","location":"chatbot.py:128","message":"model.generate_content() succeeded","data":{"response_length":len(bot_response)},"timestamp":int(__import__('time').time()*1000)})+'\n')
-            except: pass
-            # #endregion
-            
+            if first_turn:
+                # The same opening question from many visitors at once is
+                # sent to Gemini only once; the others wait for that answer.
+                bot_response, shared = self.flights.do(
+                    self.cache.key(user_message, context),
+                    lambda: self._generate(prompt, user_message, context, first_turn),
+                )
+                if shared:
+                    telemetry.emit('chatbot.coalesced', level='debug')
+            else:
+                bot_response = self._generate(prompt, user_message, context, first_turn)
+
+            self._remember(user_message, bot_response)
             return bot_response
-        
+
+        except DeadlineExceeded:
+            telemetry.emit('chatbot.deadline_exceeded', level='warning', deadline=self.deadline)
+            return self._answer_locally(user_message, 'timeout')
         except Exception as e:
-            # #region agent log
-            try:
-                import traceback
-                with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"E","location":"chatbot.py:155","message":"Exception in get_response","data":{"error":str(e),"error_type":type(e).__name__,"traceback":traceback.format_exc()[:500]},"timestamp":int(__import__('time').time()*1000)})+'\n')
-            except: pass
-            # #endregion
-            # Check if it's an API key error from Gemini
-            error_str = str(e).lower()
-            if 'api_key' in error_str or 'api key' in error_str or 'no api_key' in error_str or 'adc' in error_str:
-                return f"Sorry, I encountered an error: {str(e)}. Please check your GEMINI_API_KEY in the .env file. Get a valid key from https://makersuite.google.com/app/apikey"
-            return f"Sorry, I encountered an error: {str(e)}. Please try again later."
+            telemetry.emit('chatbot.generate_failed', level='error', error=str(e), error_type=type(e).__name__)
+            return error_message(e)
+
+    def _generate(self, prompt, user_message, context, first_turn):
+        """One Gemini call. Opening answers are cached before they are shared."""
+        started = time.monotonic()
+        try:
+            with profiling.span('llm'):
+                model, response = call_with_deadline(self.deadline, self._call_model, prompt)
+                bot_response = response.text
+        except Exception as e:
+            self._report_failure(e)
+            raise
+        self.registry.report_success()
+        self.breaker.record_success()
+        if first_turn:
+            self.cache.set(user_message, bot_response, context)
+        telemetry.emit(
+            'chatbot.generated',
+            model_name=getattr(model, '_model_name', 'unknown'),
+            duration_ms=round((time.monotonic() - started) * 1000, 1),
+            response_length=len(bot_response),
+            history_tokens=self.conversation.history_tokens(),
+        )
+        return bot_response
+
+    def stream_response(self, user_message):
+        """Yield the chatbot response in chunks as Gemini produces them"""
+        if not GEMINI_API_KEY:
+            yield MISSING_KEY_MESSAGE
+            return
+        prompt, context, first_turn = self._prepare(user_message)
+        cached = self.cache.get(user_message, context) if first_turn else None
+        if cached is not None:
+            self._remember(user_message, cached)
+            yield cached
+            return
+        if not self.breaker.allow():
+            yield self._answer_locally(user_message, 'circuit_open')
+            return
+        parts = []
+        # The deadline covers the whole stream, not each chunk.
+        deadline = time.monotonic() + self.deadline
+        reported = False
+        try:
+            _, chunks = call_with_deadline(self.deadline, self._call_model, prompt, True)
+            chunks = iter(chunks)
+            while True:
+                chunk = call_with_deadline(deadline - time.monotonic(), next, chunks, None)
+                if chunk is None:
+                    break
+                text = getattr(chunk, 'text', '')
+                if text:
+                    parts.append(text)
+                    yield text
+        except DeadlineExceeded as e:
+            telemetry.emit('chatbot.deadline_exceeded', level='warning', deadline=self.deadline, stream=True)
+            self._report_failure(e)
+            reported = True
+            yield CUT_SHORT_MESSAGE if parts else self._answer_locally(user_message, 'timeout')
+            return
+        except Exception as e:
+            telemetry.emit('chatbot.generate_failed', level='error', error=str(e), error_type=type(e).__name__, stream=True)
+            self._report_failure(e)
+            reported = True
+            yield error_message(e)
+            return
+        else:
+            self.registry.report_success()
+            self.breaker.record_success()
+            reported = True
+        finally:
+            if not reported:
+                # The client disconnected mid-stream: GeneratorExit skips the
+                # handlers above, and a half-open breaker must not wait forever
+                # for this trial call's outcome.
+                self.breaker.release()
+        bot_response = ''.join(parts)
+        if first_turn:
+            self.cache.set(user_message, bot_response, context)
+        self._remember(user_message, bot_response)
     
     def clear_history(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation.clear()
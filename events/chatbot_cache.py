@@ -0,0 +1,135 @@
+"""Cache of chatbot answers keyed on the normalised question.
+
+Entries live in the Django cache named by ``CHATBOT_CACHE_ALIAS`` (a LocMem
+cache in settings, which evicts least-recently-used entries once
+``MAX_ENTRIES`` is reached) and expire after ``CHATBOT_CACHE_TIMEOUT``
+seconds. Keys include a hash of the system prompt, so editing the prompt
+invalidates every stored answer, and a hash of the retrieved event context,
+so an answer is not reused once the events it was based on change.
+
+``SingleFlight`` covers the gap before an answer is cached: concurrent
+requests for the same key wait for the one call already in flight and share
+its result, instead of each calling the model.
+"""
+import hashlib
+import re
+import threading
+import unicodedata
+
+from django.conf import settings
+from django.core.cache import caches
+
+_PUNCT_RE = re.compile(r'[^\w\s]', re.UNICODE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_question(text):
+    """Fold case and Unicode compatibility forms, drop punctuation and extra spaces."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    text = _PUNCT_RE.sub(' ', text)
+    return _SPACE_RE.sub(' ', text).strip()
+
+
+def prompt_version(prompt):
+    return hashlib.sha1(prompt.encode('utf-8')).hexdigest()[:12]
+
+
+class ResponseCache:
+    def __init__(self, prompt, alias=None, timeout=None):
+        self.alias = alias or getattr(settings, 'CHATBOT_CACHE_ALIAS', 'default')
+        self.timeout = timeout if timeout is not None else getattr(settings, 'CHATBOT_CACHE_TIMEOUT', 60 * 60)
+        self.version = prompt_version(prompt)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, question, context=''):
+        # ``context`` is the retrieved event block sent with the question.
+        raw = f'{normalize_question(question)}\0{context}'
+        digest = hashlib.sha1(raw.encode('utf-8')).hexdigest()
+        return f'chatbot:answer:{self.version}:{digest}'
+
+    def get(self, question, context=''):
+        if not normalize_question(question):
+            return None
+        answer = self.cache.get(self.key(question, context))
+        with self._lock:
+            if answer is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return answer
+
+    def set(self, question, answer, context=''):
+        if normalize_question(question) and answer:
+            self.cache.set(self.key(question, context), answer, self.timeout)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits / total) if total else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one call.
+
+    Only threads in this process are coalesced; each worker process makes at
+    most one call per key at a time.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Return ``(fn(), shared)``. ``shared`` is True when another caller ran ``fn``.
+
+        The leader's exception, if any, is raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            call.value = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.value, False
+
+    def in_flight(self):
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,107 @@
+"""Local chatbot answers for when Gemini cannot be used.
+
+While the circuit breaker in chatbot.py is open, or when a call misses its
+deadline, questions are answered here without any network call:
+
+- The question's words are matched against one intent per entry in the
+  "Website Features" list of ``SYSTEM_PROMPT``. The best-scoring intent's
+  canned answer is returned.
+- Upcoming events that match the question are listed from the retrieval
+  index (events/retrieval.py).
+- When nothing matches, the answer lists the features themselves.
+
+A feature added to the prompt without an entry in ``FEATURE_ANSWERS``
+appears only in the overview.
+"""
+from collections import namedtuple
+
+from . import retrieval
+
+Intent = namedtuple('Intent', 'feature keywords answer')
+
+# Canned answers and extra keywords, keyed by the feature's line in SYSTEM_PROMPT.
+FEATURE_ANSWERS = {
+    'Event browsing and booking': (
+        'book booking ticket seat seats reserve attend join cancel price free browse find',
+        'Browse upcoming events at /events/ and open one to see its details. Log in, press Register on the '
+        'event page and fill in the short form to book a seat. Your bookings are listed on your profile '
+        '(/profile/), where you can also cancel them.',
+    ),
+    'User registration and profiles': (
+        'account sign signup login log password profile interests wishlist saved',
+        'Create an account at /signup/ and log in at /login/. Your profile (/profile/) shows your bookings, '
+        'your saved events and your interests, which shape the "For you" page.',
+    ),
+    'Event organizer dashboard': (
+        'organiser organizer create host publish list manage attendees export import dashboard',
+        'To host events, choose the organiser role when you sign up. You can then create events at '
+        '/create-event/, and the organiser dashboard (/organiser/) lists your events and their '
+        'registrations, with CSV export.',
+    ),
+    'Community features': (
+        'community blog testimonial testimonials review reviews rating ratings story stories',
+        'The community page (/community/) has blog posts, highlights and testimonials. After attending an '
+        'event you can rate and review it on its event page.',
+    ),
+    'Gallery': (
+        'gallery photo photos picture pictures past moments',
+        'The gallery (/gallery/) has photos and highlights from past events.',
+    ),
+    'Event filtering by date and location': (
+        'filter search date location city near nearby where when category sort',
+        'On /events/ you can search by keyword and filter by date and location. You can also look for events '
+        'near a place within a radius, or sort by rating.',
+    ),
+}
+EVENTS_LISTED = 3
+OVERVIEW_INTRO = "I can't reach the assistant right now, but here is what you can do on Book My Event:"
+EVENTS_INTRO = 'Upcoming events that may match your question:'
+
+
+def prompt_features(prompt):
+    """The bullet lines under "Website Features:" in ``prompt``."""
+    _, found, rest = prompt.partition('Website Features:')
+    features = []
+    for line in rest.strip().splitlines() if found else ():
+        line = line.strip()
+        if not line.startswith('- '):
+            break
+        features.append(line[2:].strip())
+    return features
+
+
+class FaqResponder:
+    def __init__(self, prompt):
+        self.features = prompt_features(prompt)
+        self.intents = []
+        for feature in self.features:
+            extra, answer = FEATURE_ANSWERS.get(feature, ('', ''))
+            keywords = frozenset(retrieval.tokenize(f'{feature} {extra}'))
+            self.intents.append(Intent(feature, keywords, answer))
+
+    def intent(self, message):
+        """The best-matching intent with an answer, or None."""
+        words = set(retrieval.tokenize(message))
+        best, best_score = None, 0
+        for intent in self.intents:
+            score = len(words & intent.keywords)
+            if intent.answer and score > best_score:
+                best, best_score = intent, score
+        return best
+
+    def overview(self):
+        return '\n'.join([OVERVIEW_INTRO] + [f'- {feature}' for feature in self.features])
+
+    def answer(self, message, previous=''):
+        intent = self.intent(message)
+        try:
+            events = retrieval.matching_events(message, EVENTS_LISTED, previous)
+        except Exception:
+            # The database may be the reason Gemini calls are failing too.
+            events = []
+        parts = [intent.answer] if intent else []
+        if events:
+            parts.append('\n'.join(
+                [EVENTS_INTRO] + [f'- {event.title} ({event.date:%a %d %b}): /events/{event.slug}/' for event in events]
+            ))
+        return '\n\n'.join(parts) or self.overview()
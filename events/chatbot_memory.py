@@ -0,0 +1,99 @@
+"""Per-session chatbot conversation memory.
+
+A ``Conversation`` holds the recent turns of one visitor's chat plus a short
+running summary of older turns. It is stored in the Django session under
+``SESSION_KEY`` as plain lists of strings, so it works with any session
+backend and serializer.
+
+Its size is bounded. Each message is clipped to ``MAX_MESSAGE_TOKENS``.
+Whenever the stored turns go over ``HISTORY_TOKEN_BUDGET`` estimated tokens,
+the oldest turns are folded into the summary, one clipped line per turn and
+with no extra model call. The summary keeps only its newest lines within
+``SUMMARY_TOKEN_BUDGET``. The prompt's history section is therefore limited
+to about the sum of the two budgets, however long the chat runs.
+"""
+import re
+
+from .retrieval import CHARS_PER_TOKEN, estimate_tokens
+
+SESSION_KEY = 'chatbot_conversation'
+HISTORY_TOKEN_BUDGET = 800
+SUMMARY_TOKEN_BUDGET = 200
+MAX_MESSAGE_TOKENS = 300
+SUMMARY_LINE_CHARS = 160
+# The newest exchange is always kept whole, even when it alone is over budget.
+MIN_TURNS = 2
+ROLE_LABELS = {'user': 'User', 'assistant': 'Assistant'}
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s')
+
+
+def clip(text, limit):
+    text = ' '.join((text or '').split())
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + '…'
+
+
+def _label(role):
+    return ROLE_LABELS.get(role, role.title())
+
+
+class Conversation:
+    def __init__(self, turns=None, summary=None):
+        self.turns = [[role, content] for role, content in turns or []]  # [role, content], oldest first
+        self.summary = list(summary or [])
+
+    @classmethod
+    def load(cls, session):
+        data = session.get(SESSION_KEY) or {}
+        try:
+            return cls(data.get('turns'), data.get('summary'))
+        except (AttributeError, TypeError, ValueError):
+            # Stored by an incompatible version; start over.
+            return cls()
+
+    def save(self, session):
+        session[SESSION_KEY] = {'turns': self.turns, 'summary': self.summary}
+
+    def __bool__(self):
+        return bool(self.turns or self.summary)
+
+    def add(self, role, content):
+        self.turns.append([role, clip(content, MAX_MESSAGE_TOKENS * CHARS_PER_TOKEN)])
+        self._compact()
+
+    def clear(self):
+        self.turns = []
+        self.summary = []
+
+    def last_user_message(self):
+        for role, content in reversed(self.turns):
+            if role == 'user':
+                return content
+        return ''
+
+    def history_tokens(self):
+        return sum(estimate_tokens(content) + 2 for _, content in self.turns)
+
+    def summary_tokens(self):
+        return sum(estimate_tokens(line) + 1 for line in self.summary)
+
+    def _compact(self):
+        while len(self.turns) > MIN_TURNS and self.history_tokens() > HISTORY_TOKEN_BUDGET:
+            role, content = self.turns.pop(0)
+            if role == 'assistant':
+                # The first sentence of an answer is usually its gist.
+                content = _SENTENCE_END_RE.split(content, 1)[0]
+            self.summary.append(f'{_label(role)}: {clip(content, SUMMARY_LINE_CHARS)}')
+        while self.summary and self.summary_tokens() > SUMMARY_TOKEN_BUDGET:
+            self.summary.pop(0)
+
+    def transcript(self):
+        """Prompt section for the conversation so far; '' before the first turn."""
+        sections = []
+        if self.summary:
+            sections.append('Summary of the earlier conversation:\n' + '\n'.join(self.summary))
+        if self.turns:
+            lines = '\n'.join(f'{_label(role)}: {content}' for role, content in self.turns)
+            sections.append(f'Recent conversation:\n{lines}')
+        return '\n\n'.join(sections)
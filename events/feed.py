@@ -0,0 +1,173 @@
+"""Personalised "For you" feed.
+
+Upcoming published events are loaded once into column arrays: category
+index, city index, a popularity score and a recency score. Scoring a user is
+then one vectorised expression over those arrays, followed by a partial sort
+for the top results::
+
+    score = w_interest * wants[category] + w_city * (city == user_city)
+          + w_popularity * popularity + w_recency * recency
+
+The snapshot is rebuilt when the home cache generation changes (any Event
+save or delete) or after ``SNAPSHOT_TTL`` seconds, which picks up new seat
+counts. The ranked ids for each user are kept in the default cache.
+Without NumPy the same scores are computed in a plain Python loop.
+"""
+import hashlib
+import heapq
+import math
+import threading
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from . import home_cache
+from .interests import CATEGORY_CHOICES, city_key, mask_to_interests
+from .models import Event, Registration
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+WEIGHTS = {
+    'interest': 3.0,
+    'city': 2.0,
+    'popularity': 1.0,
+    'recency': 1.0,
+}
+# Recency decays by 1/e for every RECENCY_DAYS until the event.
+RECENCY_DAYS = 30
+SNAPSHOT_TTL = 5 * 60
+FEED_CACHE_TIMEOUT = 5 * 60
+# Ranked ids cached per user; enough to fill a page after dropping events
+# the user is already registered for.
+CACHED_RESULTS = 100
+
+CATEGORIES = [key for key, _ in CATEGORY_CHOICES]
+CATEGORY_INDEX = {key: i for i, key in enumerate(CATEGORIES)}
+NO_CATEGORY = len(CATEGORIES)
+
+
+def profile_interests(profile):
+    if profile is None:
+        return set()
+    return set(mask_to_interests(profile.interest_mask))
+
+
+class Snapshot:
+    def __init__(self, rows, generation, today=None):
+        today = today or timezone.localdate()
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.version = f'{generation}:{int(time.time())}'
+        self.cities = {}
+        ids, categories, cities, seats, days = [], [], [], [], []
+        for pk, category, location, seats_taken, date in rows:
+            ids.append(pk)
+            categories.append(CATEGORY_INDEX.get(category, NO_CATEGORY))
+            cities.append(self.cities.setdefault(city_key(location), len(self.cities)))
+            seats.append(seats_taken)
+            days.append((date - today).days)
+        top_seats = math.log1p(max(seats, default=0)) or 1.0
+        popularity = [math.log1p(n) / top_seats for n in seats]
+        recency = [math.exp(-d / RECENCY_DAYS) for d in days]
+        if np is not None:
+            self.ids = np.array(ids, dtype=np.int64)
+            self.category = np.array(categories, dtype=np.int16)
+            self.city = np.array(cities, dtype=np.int32)
+            self.days = np.array(days, dtype=np.int32)
+            # The user-independent part of the score, computed once.
+            self.base = WEIGHTS['popularity'] * np.array(popularity) + WEIGHTS['recency'] * np.array(recency)
+        else:
+            self.ids, self.category, self.city, self.days = ids, categories, cities, days
+            self.base = [
+                WEIGHTS['popularity'] * p + WEIGHTS['recency'] * r for p, r in zip(popularity, recency)
+            ]
+
+    def __len__(self):
+        return len(self.ids)
+
+    def rank(self, interests, city, limit):
+        """Return up to ``limit`` event ids, best first; ties go to the sooner event."""
+        wants = [WEIGHTS['interest'] if key in interests else 0.0 for key in CATEGORIES] + [0.0]
+        city_id = self.cities.get(city_key(city), -1)
+        if np is not None:
+            return self._rank_numpy(wants, city_id, limit)
+        return self._rank_python(wants, city_id, limit)
+
+    def _rank_numpy(self, wants, city_id, limit):
+        score = self.base + np.asarray(wants)[self.category]
+        if city_id >= 0:
+            score = score + WEIGHTS['city'] * (self.city == city_id)
+        if limit < len(score):
+            top = np.argpartition(-score, limit)[:limit]
+        else:
+            top = np.arange(len(score))
+        order = np.lexsort((self.days[top], -score[top]))
+        return self.ids[top[order]].tolist()
+
+    def _rank_python(self, wants, city_id, limit):
+        city_weight = WEIGHTS['city']
+        scored = (
+            (base + wants[cat] + (city_weight if c == city_id else 0.0), -days, pk)
+            for pk, base, cat, c, days in zip(self.ids, self.base, self.category, self.city, self.days)
+        )
+        return [pk for _, _, pk in heapq.nlargest(limit, scored, key=lambda item: (item[0], item[1]))]
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def build_snapshot(generation=None):
+    generation = home_cache.generation() if generation is None else generation
+    rows = (
+        Event.objects.filter(is_published=True, date__gte=timezone.localdate())
+        .values_list('id', 'category', 'location', 'seats_taken', 'date')
+        .iterator(chunk_size=5000)
+    )
+    return Snapshot(rows, generation)
+
+
+def get_snapshot():
+    global _snapshot
+    generation = home_cache.generation()
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.generation == generation and time.monotonic() - snapshot.built_at < SNAPSHOT_TTL:
+        return snapshot
+    with _snapshot_lock:
+        snapshot = _snapshot
+        if snapshot is None or snapshot.generation != generation or time.monotonic() - snapshot.built_at >= SNAPSHOT_TTL:
+            snapshot = _snapshot = build_snapshot(generation)
+    return snapshot
+
+
+def ranked_ids(interests, city, limit=CACHED_RESULTS):
+    snapshot = get_snapshot()
+    signature = hashlib.sha1(f'{",".join(sorted(interests))}|{city_key(city)}'.encode('utf-8')).hexdigest()[:16]
+    # Users with the same interests and city share an entry.
+    key = f'feed:{snapshot.version}:{signature}:{limit}'
+    ids = cache.get(key)
+    if ids is None:
+        ids = snapshot.rank(interests, city, limit)
+        cache.set(key, ids, FEED_CACHE_TIMEOUT)
+    return ids
+
+
+def for_user(user, limit=24, fields=None):
+    """The user's feed as a list of Events, best first."""
+    profile = getattr(user, 'profile', None) if user.is_authenticated else None
+    ids = ranked_ids(profile_interests(profile), profile.city if profile else '')
+    if user.is_authenticated:
+        registered = set(
+            Registration.objects.filter(user=user, cancelled=False, event_id__in=ids).values_list('event_id', flat=True)
+        )
+        ids = [pk for pk in ids if pk not in registered]
+    ids = ids[:limit]
+    qs = Event.objects.all()
+    if fields:
+        qs = qs.only(*fields)
+    events = qs.in_bulk(ids)
+    return [events[pk] for pk in ids if pk in events]
@@ -1,5 +1,5 @@
 from django import forms
-from .models import Registration, Event, Profile
+from .models import Registration, Event, Profile, Review
 from django.contrib.auth.models import User
 
 
@@ -89,9 +89,10 @@ class SignupForm(forms.ModelForm):
 class EventForm(forms.ModelForm):
     class Meta:
         model = Event
-        fields = ['title', 'short_description', 'description', 'highlights', 'image_url', 'date', 'time', 'location', 'capacity']
+        fields = ['title', 'category', 'short_description', 'description', 'highlights', 'image_url', 'date', 'time', 'location', 'capacity']
         widgets = {
             'title': forms.TextInput(attrs={'class': 'border p-2 w-full rounded', 'placeholder': 'Event name'}),
+            'category': forms.Select(attrs={'class': 'border p-2 w-full rounded'}),
             'short_description': forms.Textarea(attrs={'class': 'border p-2 w-full rounded', 'placeholder': 'Short description', 'rows': 2}),
             'description': forms.Textarea(attrs={'class': 'border p-2 w-full rounded', 'placeholder': 'Full event details', 'rows': 4}),
             'highlights': forms.Textarea(attrs={'class': 'border p-2 w-full rounded', 'placeholder': 'Event highlights (what makes this special)', 'rows': 2}),
@@ -102,6 +103,23 @@ class EventForm(forms.ModelForm):
             'capacity': forms.NumberInput(attrs={'class': 'border p-2 w-full rounded', 'placeholder': 'Capacity (number of attendees)'}),
         }
 
+
+class ReviewForm(forms.ModelForm):
+    rating = forms.TypedChoiceField(
+        choices=[(n, '★' * n) for n in range(5, 0, -1)],
+        coerce=int,
+        widget=forms.RadioSelect,
+        label='Your rating',
+    )
+
+    class Meta:
+        model = Review
+        fields = ['rating', 'comment']
+        widgets = {
+            'comment': forms.Textarea(attrs={'class': 'border p-2 w-full rounded', 'placeholder': 'What did you think? (optional)', 'rows': 3}),
+        }
+
+
 class ProfileForm(forms.ModelForm):
     interests = forms.MultipleChoiceField(
         choices=[
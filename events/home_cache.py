@@ -0,0 +1,56 @@
+"""Caching for the home page.
+
+All home page entries (the query payload, template fragments and the full
+anonymous page) are keyed on a generation number. Saving or deleting an Event
+or Testimonial bumps the generation (see signals.py), which orphans every
+entry at once; orphans simply expire. Invalidation only reaches other worker
+processes when CACHES['default'] is a shared backend such as Redis or
+Memcached.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Event, Testimonial
+
+HOME_CACHE_TIMEOUT = getattr(settings, 'HOME_CACHE_TIMEOUT', 15 * 60)
+GENERATION_KEY = 'home:generation'
+
+
+def generation():
+    gen = cache.get(GENERATION_KEY)
+    if gen is None:
+        # Start from the clock so a cleared counter never reuses an old number.
+        cache.add(GENERATION_KEY, int(time.time() * 1000), None)
+        gen = cache.get(GENERATION_KEY)
+    return gen
+
+
+def invalidate(**kwargs):
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, int(time.time() * 1000), None)
+
+
+def get_payload(gen):
+    key = f'home:payload:{gen}'
+    payload = cache.get(key)
+    if payload is None:
+        published = Event.objects.filter(is_published=True)
+        payload = {
+            'events': list(published.order_by('date')[:8]),
+            'testimonials': list(Testimonial.objects.select_related('user').order_by('-created_at')[:3]),
+            'latest': list(published.order_by('-created_at')[:6]),
+        }
+        cache.set(key, payload, HOME_CACHE_TIMEOUT)
+    return payload
+
+
+def get_page(gen):
+    return cache.get(f'home:page:{gen}')
+
+
+def set_page(gen, content):
+    cache.set(f'home:page:{gen}', content, HOME_CACHE_TIMEOUT)
@@ -0,0 +1,159 @@
+"""Bulk event import from CSV or JSON-lines files.
+
+Rows are read one at a time, validated with ``EventForm`` and collected into
+chunks. Each chunk gets its slugs from one ``SlugAllocator`` batch and is
+written with ``bulk_create`` in its own transaction. Only the current chunk
+and at most ``MAX_REPORTED_ERRORS`` error entries are held in memory, so file
+size does not change memory use.
+
+Columns are the ``EventForm`` fields (title, short_description, description,
+highlights, image_url, date, time, location, capacity). Unknown columns are
+ignored.
+"""
+import csv
+import io
+import json
+
+from django.db import IntegrityError, transaction
+
+from . import geo, home_cache, search
+from .forms import EventForm
+from .models import Event
+from .slugs import SlugAllocator
+
+FORMATS = ('csv', 'jsonl')
+CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []  # (row number, {field: [messages]})
+
+    def add_error(self, row_number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row_number, errors))
+
+    @property
+    def truncated(self):
+        return self.error_count > len(self.errors)
+
+    def as_dict(self):
+        return {
+            'rows': self.rows,
+            'created': self.created,
+            'error_count': self.error_count,
+            'errors': [{'row': row, 'errors': errors} for row, errors in self.errors],
+        }
+
+
+def detect_format(filename):
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    raise ImportFormatError('Cannot tell the file format; use a .csv or .jsonl file.')
+
+
+def iter_rows(binary_file, fmt):
+    """Yield (row number, dict) pairs from a binary file object.
+
+    Row numbers are 1-based data rows, so a CSV header is not counted.
+    A row that cannot be parsed is yielded with an ``Exception`` instead of a dict.
+    """
+    text = io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
+    try:
+        if fmt == 'csv':
+            for number, row in enumerate(csv.DictReader(text), start=1):
+                yield number, {k.strip(): v for k, v in row.items() if k}
+        elif fmt == 'jsonl':
+            number = 0
+            for line in text:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, e
+                    continue
+                if not isinstance(row, dict):
+                    yield number, ValueError('Each line must be a JSON object.')
+                    continue
+                yield number, row
+        else:
+            raise ImportFormatError(f'Unsupported format {fmt!r}; expected one of {", ".join(FORMATS)}.')
+    finally:
+        # Leave the underlying file open for its owner.
+        text.detach()
+
+
+def _form_data(row):
+    # Forms expect strings; JSON rows may carry numbers or nulls.
+    return {key: '' if value is None else str(value) for key, value in row.items()}
+
+
+def _write_chunk(chunk, allocator, report):
+    slugs = allocator.allocate([event.title for event, _ in chunk])
+    for (event, _), slug in zip(chunk, slugs):
+        event.slug = slug
+    events = [event for event, _ in chunk]
+    try:
+        with transaction.atomic():
+            Event.objects.bulk_create(events)
+            if any(event.pk is None for event in events):
+                # Backends without RETURNING: look the new ids up by slug.
+                ids = dict(Event.objects.filter(slug__in=slugs).values_list('slug', 'pk'))
+                for event in events:
+                    event.pk = ids[event.slug]
+            search.index_events(events)
+    except IntegrityError as e:
+        # Another writer took one of the slugs between allocation and insert.
+        for _, number in chunk:
+            report.add_error(number, {'__all__': [f'Could not save row: {e}']})
+        return
+    report.created += len(events)
+
+
+def import_events(rows, organiser, publish=True, chunk_size=CHUNK_SIZE, dry_run=False):
+    """Validate and insert events from ``(row number, dict)`` pairs. Returns an ImportReport."""
+    report = ImportReport()
+    allocator = SlugAllocator()
+    chunk = []
+    for number, row in rows:
+        report.rows += 1
+        if isinstance(row, Exception):
+            report.add_error(number, {'__all__': [f'Could not parse row: {row}']})
+            continue
+        form = EventForm(data=_form_data(row))
+        if not form.is_valid():
+            report.add_error(number, {field: list(messages) for field, messages in form.errors.items()})
+            continue
+        event = form.save(commit=False)
+        event.organiser = organiser
+        event.is_published = publish
+        # bulk_create skips Event.save(), which would geocode the location.
+        geo.fill_coordinates(event)
+        chunk.append((event, number))
+        if len(chunk) >= chunk_size:
+            if not dry_run:
+                _write_chunk(chunk, allocator, report)
+            chunk = []
+    if chunk and not dry_run:
+        _write_chunk(chunk, allocator, report)
+    if report.created:
+        home_cache.invalidate()
+    return report
+
+
+def import_file(binary_file, fmt, organiser, **kwargs):
+    return import_events(iter_rows(binary_file, fmt), organiser, **kwargs)
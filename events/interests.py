@@ -0,0 +1,74 @@
+"""Interest categories and their bitmask encoding.
+
+``Profile.interests`` stays the comma-separated string that ProfileForm and
+signup write. ``Profile.save()`` mirrors it into ``interest_mask``, with one
+bit per category in ``CATEGORY_CHOICES`` order, and mirrors the city into the
+normalised ``city_key``. Both columns are indexed (see events/audience.py).
+Only append new categories to the end, because a category's bit is its
+position in the list.
+"""
+CATEGORY_CHOICES = [
+    ('music', 'Music & Concerts'),
+    ('tech', 'Technology & Tech Talks'),
+    ('sports', 'Sports & Fitness'),
+    ('arts', 'Arts & Culture'),
+    ('food', 'Food & Dining'),
+    ('business', 'Business & Networking'),
+    ('education', 'Education & Learning'),
+    ('social', 'Social & Community'),
+]
+CATEGORY_BITS = {key: 1 << i for i, (key, _) in enumerate(CATEGORY_CHOICES)}
+ALL_MASKS = range(1 << len(CATEGORY_CHOICES))
+
+
+def split_interests(value):
+    """Accept a comma-separated string or an iterable of category keys."""
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item.strip() for item in value or () if item and item.strip()]
+
+
+def interests_to_mask(value):
+    mask = 0
+    for key in split_interests(value):
+        mask |= CATEGORY_BITS.get(key, 0)
+    return mask
+
+
+def mask_to_interests(mask):
+    return [key for key, bit in CATEGORY_BITS.items() if mask & bit]
+
+
+def filter_mask(value):
+    """Mask for categories given in a filter, in any case.
+
+    Unlike ``interests_to_mask``, an unknown category raises ValueError: it
+    would add no bit, and an empty ``any_of`` would then match everyone.
+    """
+    mask = 0
+    for key in split_interests(value):
+        bit = CATEGORY_BITS.get(key.casefold())
+        if bit is None:
+            raise ValueError(f'Unknown interest category "{key}".')
+        mask |= bit
+    return mask
+
+
+def masks_matching(any_of=None, all_of=None):
+    """Every mask value with at least one ``any_of`` bit and all ``all_of`` bits.
+
+    There are only 2**len(CATEGORY_CHOICES) masks, so a set condition turns
+    into an ``IN (...)`` list that an index on the mask column can serve.
+    Raises ValueError for unknown categories.
+    """
+    any_bits = filter_mask(any_of or ())
+    all_bits = filter_mask(all_of or ())
+    return [
+        mask for mask in ALL_MASKS
+        if (not any_bits or mask & any_bits) and mask & all_bits == all_bits
+    ]
+
+
+def city_key(text):
+    """'Pune, India' and ' pune ' both become 'pune'."""
+    return (text or '').split(',')[0].strip().casefold()
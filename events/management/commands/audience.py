@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events import audience
+
+
+class Command(BaseCommand):
+    help = 'Count, or list, users matching a city and interest filter.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--city')
+        parser.add_argument('--any', dest='any_of', help='Comma-separated categories; match at least one.')
+        parser.add_argument('--all', dest='all_of', help='Comma-separated categories; match every one.')
+        parser.add_argument('--role', choices=['attendee', 'organiser'])
+        parser.add_argument('--list', action='store_true', help='Print user id and email for each match.')
+
+    def handle(self, *args, **options):
+        filters = {key: options[key] for key in ('city', 'any_of', 'all_of', 'role')}
+        try:
+            total = audience.count(**filters)
+        except ValueError as e:
+            raise CommandError(e)
+        if options['list']:
+            for user_id, email in audience.iter_recipients(**filters):
+                self.stdout.write(f'{user_id}\t{email}')
+        self.stdout.write(self.style.SUCCESS(f'{total} matching users.'))
@@ -0,0 +1,354 @@
+"""Benchmark every named route of the events app.
+
+Seeds a dataset with generate_fake_data inside a transaction that is rolled
+back afterwards, then requests each route through the test client and records
+p50/p95 latency, SQL query count and response size. The chatbot routes talk
+to an in-process fake LLM instead of Gemini.
+
+With --baseline, the run fails when a route issues more queries than the
+baseline, or when its p95 grows past --latency-factor times the baseline.
+--write-baseline stores the current numbers for later runs.
+
+    python manage.py benchmark_views --events 5000 --write-baseline bench.json
+    python manage.py benchmark_views --events 5000 --baseline bench.json
+"""
+import io
+import json
+import statistics
+import time
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+
+from events import booking, chatbot, reviews, views
+from events.models import Event, Registration, Review
+from events.pagination import keyset_paginate
+
+BENCH_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-default'},
+    'chatbot': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'benchmark-chatbot'},
+}
+PREFIX = 'bench'
+
+
+class Rollback(Exception):
+    pass
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel, answering after a fixed delay."""
+
+    def __init__(self, name, latency):
+        self._model_name = name
+        self.latency = latency
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        time.sleep(self.latency)
+        text = 'You can browse upcoming events on the Events page and book a seat from the event page.'
+        if stream:
+            return iter([FakeResponse(part + ' ') for part in text.split(' ')])
+        return FakeResponse(text)
+
+
+class FakeGenAI:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def list_models(self):
+        return []
+
+    def GenerativeModel(self, name):
+        return FakeModel(name, self.latency)
+
+
+class Route:
+    """One benchmarked request. ``prepare`` runs before each timed request and
+    may return replacement ``args``, ``data`` or ``client`` values."""
+
+    def __init__(self, label, name, client='anon', method='get', args=None, data=None, prepare=None, json_body=False):
+        self.label = label
+        self.name = name
+        self.client = client
+        self.method = method
+        self.args = args
+        self.data = data
+        self.prepare = prepare
+        self.json_body = json_body
+
+
+async def _read_async(chunks):
+    return b''.join([chunk async for chunk in chunks])
+
+
+def read_body(response):
+    """Return the full body, draining streaming (including async) responses."""
+    if not response.streaming:
+        return response.content
+    if response.is_async:
+        return async_to_sync(_read_async)(response.streaming_content)
+    return b''.join(response.streaming_content)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the events routes (latency, query count, bytes) and compare against a baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--events', type=int, default=1000)
+        parser.add_argument('--registrations', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--llm-latency-ms', type=float, default=0.0, help='Delay added by the fake LLM.')
+        parser.add_argument('--baseline', help='JSON file to compare against.')
+        parser.add_argument('--write-baseline', help='Write the results to this JSON file.')
+        parser.add_argument('--latency-factor', type=float, default=2.0,
+                            help='Fail when p95 exceeds the baseline p95 times this factor.')
+        parser.add_argument('--latency-floor-ms', type=float, default=5.0,
+                            help='Ignore p95 growth smaller than this, which is timer noise on fast routes.')
+
+    def handle(self, *args, **options):
+        self.options = options
+        baseline = None
+        if options['baseline']:
+            try:
+                baseline = json.loads(Path(options['baseline']).read_text())
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline {options["baseline"]}: {e}')
+
+        fake_registry = chatbot.ModelRegistry(client=FakeGenAI(options['llm_latency_ms'] / 1000))
+        results = {}
+        try:
+            # The limiter still runs, but with limits the benchmark never reaches.
+            rate_limit = {**settings.CHATBOT_RATE_LIMIT, 'BURST': 10 ** 6, 'IP_BURST': 10 ** 6}
+            with override_settings(CACHES=BENCH_CACHES, ALLOWED_HOSTS=['testserver'], CHATBOT_RATE_LIMIT=rate_limit), \
+                    mock.patch.object(chatbot, 'GEMINI_API_KEY', 'benchmark'), \
+                    mock.patch.object(chatbot, 'model_registry', fake_registry), \
+                    transaction.atomic():
+                for alias in BENCH_CACHES:
+                    caches[alias].clear()
+                self.seed()
+                for route in self.routes():
+                    results[route.label] = self.measure(route)
+                raise Rollback()
+        except Rollback:
+            pass
+
+        failures = self.report(results, baseline)
+        if options['write_baseline']:
+            payload = {
+                'dataset': {key: options[key] for key in ('users', 'events', 'registrations', 'seed')},
+                'routes': results,
+            }
+            Path(options['write_baseline']).write_text(json.dumps(payload, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(f'Baseline written to {options["write_baseline"]}')
+        if failures:
+            raise CommandError(f'{len(failures)} benchmark regressions: ' + '; '.join(failures))
+
+    def seed(self):
+        call_command(
+            'generate_fake_data', prefix=PREFIX, users=self.options['users'], events=self.options['events'],
+            registrations=self.options['registrations'], reviews=self.options['registrations'] // 2, wishlists=0, seed=self.options['seed'],
+            stdout=io.StringIO(),
+        )
+        events = Event.objects.filter(slug__startswith=f'{PREFIX}-', is_published=True)
+        self.event = events.filter(capacity=0).order_by('pk').first() or events.order_by('pk').first()
+        self.organiser = self.event.organiser
+        # The attendee is a user with registrations, so the profile page has rows to render.
+        self.attendee = (
+            User.objects.filter(username__startswith=f'{PREFIX}_', registration__isnull=False)
+            .exclude(pk=self.organiser.pk).order_by('pk').first()
+        )
+        self.unregistered_event = (
+            events.filter(capacity=0).exclude(registration__user=self.attendee).order_by('pk').first()
+        )
+        self.registered_event = (
+            Event.objects.filter(registration__user=self.attendee, registration__cancelled=False).order_by('pk').first()
+        )
+        self.clients = {'anon': Client(), 'attendee': Client(), 'organiser': Client()}
+        self.clients['attendee'].force_login(self.attendee)
+        self.clients['organiser'].force_login(self.organiser)
+        self.counter = 0
+
+    def fresh_registration(self):
+        registration = Registration(
+            user=self.attendee, event=self.unregistered_event, full_name='Benchmark', terms_agreed=True,
+        )
+        booking.register(registration)
+        return {'args': [registration.pk]}
+
+    def fresh_review(self):
+        review = reviews.save(Review(user=self.attendee, event=self.registered_event, rating=3))
+        return {'args': [review.pk]}
+
+    def unique_question(self):
+        self.counter += 1
+        return {'data': {'message': f'How do I book event number {self.counter}?'}}
+
+    def event_question(self):
+        # Matches catalogue events, so the prompt carries retrieved context.
+        self.counter += 1
+        return {'data': {'message': f'Any music or tech events this month? ({self.counter})'}}
+
+    def routes(self):
+        event = self.event
+        # The cursor event_list would put in its "next" link. Response.context
+        # is only recorded under the test runner, so page it the same way here.
+        first_page = keyset_paginate(Event.objects.filter(is_published=True), 'date', views.EVENTS_PER_PAGE)
+        routes = [
+            Route('index', 'index'),
+            Route('event_list', 'event_list'),
+            Route('event_list (page 2)', 'event_list', data={'after': first_page.next_cursor}),
+            Route('event_list (location)', 'event_list', data={'location': event.location.split(',')[0]}),
+            Route('event_list (date)', 'event_list', data={'date': event.date.isoformat()}),
+            Route('event_list (search)', 'event_list', data={'q': event.title.split()[0]}),
+            Route('event_list (near)', 'event_list', data={'near': event.location.split(',')[0]}),
+            Route('event_list (signed in)', 'event_list', client='attendee'),
+            Route('event_list (top rated)', 'event_list', data={'sort': 'rating'}),
+            Route('for_you', 'for_you', client='attendee'),
+            Route('event_detail', 'event_detail', args=[event.slug]),
+            Route('register_event', 'register_event', client='attendee', args=[self.unregistered_event.slug]),
+            Route('signup', 'signup'),
+            Route('login', 'login'),
+            Route('profile', 'profile', client='attendee'),
+            Route('cancel_registration', 'cancel_registration', client='attendee', method='post',
+                  prepare=self.fresh_registration),
+            Route('submit_review', 'submit_review', client='attendee', method='post', args=[self.registered_event.slug],
+                  data={'rating': 4, 'comment': 'Benchmark review'}),
+            Route('delete_review', 'delete_review', client='attendee', method='post', prepare=self.fresh_review),
+            Route('toggle_wishlist', 'toggle_wishlist', client='attendee', method='post', args=[event.slug],
+                  data={'action': 'add'}),
+            Route('gallery', 'gallery'),
+            Route('community', 'community'),
+            Route('support', 'support'),
+            Route('privacy', 'privacy'),
+            Route('terms', 'terms'),
+            Route('organiser_dashboard', 'organiser_dashboard', client='organiser'),
+            Route('organiser_event_registrations', 'organiser_event_registrations', client='organiser',
+                  args=[event.slug]),
+            Route('export_event_registrations', 'export_event_registrations', client='organiser',
+                  args=[event.slug]),
+            Route('export_all_registrations', 'export_all_registrations', client='organiser',
+                  data={'format': 'jsonl'}),
+            Route('import_events', 'import_events', client='organiser'),
+            Route('audience_count', 'audience_count', client='organiser',
+                  data={'city': event.location, 'any': 'tech,music'}),
+            Route('create_event', 'create_event', client='organiser'),
+            Route('chatbot_response', 'chatbot_response', method='post', json_body=True,
+                  prepare=self.unique_question),
+            # Only opening questions are answered from the cache, so each request
+            # starts a new conversation. The other chatbot routes keep one
+            # session and so measure follow-ups with a full history.
+            Route('chatbot_response (cached)', 'chatbot_response', method='post', json_body=True,
+                  data={'message': 'How do I book an event?'}, prepare=self.new_visitor),
+            Route('chatbot_response (events)', 'chatbot_response', method='post', json_body=True,
+                  prepare=self.event_question),
+            Route('chatbot_stream', 'chatbot_stream', method='post', json_body=True, prepare=self.unique_question),
+            # Logging out ends the session, so every request gets a new client.
+            Route('logout', 'logout', prepare=self.fresh_client),
+        ]
+        self.check_coverage(routes)
+        return routes
+
+    def check_coverage(self, routes):
+        covered = {route.name for route in routes}
+        named = {name for name in get_resolver().namespace_dict['events'][1].reverse_dict if isinstance(name, str)}
+        missing = sorted(named - covered)
+        if missing:
+            raise CommandError(f'Routes without a benchmark: {", ".join(missing)}. Add them to routes().')
+
+    def new_visitor(self):
+        return {'client': Client()}
+
+    def fresh_client(self):
+        client = Client()
+        client.force_login(self.attendee)
+        return {'client': client}
+
+    def request(self, route):
+        """Issue one request. Returns (milliseconds, query count, bytes)."""
+        kwargs = {'args': route.args, 'data': route.data, 'client': self.clients.get(route.client)}
+        if route.prepare:
+            kwargs.update(route.prepare())
+        client = kwargs['client']
+        url = reverse(f'events:{route.name}', args=kwargs['args'])
+        data = kwargs['data'] or {}
+        if route.json_body:
+            call = lambda: client.post(url, json.dumps(data), content_type='application/json')
+        else:
+            call = lambda: getattr(client, route.method)(url, data)
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = call()
+            body = read_body(response)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            raise CommandError(f'{route.label} returned HTTP {response.status_code}.')
+        return elapsed * 1000, len(captured.captured_queries), len(body)
+
+    def measure(self, route):
+        for _ in range(self.options['warmup']):
+            self.request(route)
+        timings, queries, size = [], 0, 0
+        for _ in range(self.options['iterations']):
+            elapsed, count, size = self.request(route)
+            timings.append(elapsed)
+            queries = max(queries, count)
+        return {
+            'p50_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'queries': queries,
+            'bytes': size,
+        }
+
+    def report(self, results, baseline):
+        base_routes = (baseline or {}).get('routes', {})
+        factor = self.options['latency_factor']
+        floor = self.options['latency_floor_ms']
+        failures = []
+        self.stdout.write(f'{"route":<34} {"p50 ms":>8} {"p95 ms":>8} {"queries":>8} {"bytes":>9}  vs baseline')
+        for label, result in results.items():
+            note = ''
+            base = base_routes.get(label)
+            if baseline is not None and base is None:
+                note = 'new'
+            elif base is not None:
+                notes = []
+                if result['queries'] > base['queries']:
+                    notes.append(f'queries {base["queries"]} -> {result["queries"]}')
+                limit = max(base['p95_ms'] * factor, base['p95_ms'] + floor)
+                if result['p95_ms'] > limit:
+                    notes.append(f'p95 {base["p95_ms"]} -> {result["p95_ms"]} ms')
+                if notes:
+                    failures.append(f'{label}: ' + ', '.join(notes))
+                    note = 'FAIL ' + ', '.join(notes)
+                else:
+                    note = f'ok (p95 {base["p95_ms"]} ms, {base["queries"]} queries)'
+            line = (
+                f'{label:<34} {result["p50_ms"]:>8.2f} {result["p95_ms"]:>8.2f} '
+                f'{result["queries"]:>8} {result["bytes"]:>9}  {note}'
+            )
+            self.stdout.write(self.style.ERROR(line) if note.startswith('FAIL') else line)
+        return failures
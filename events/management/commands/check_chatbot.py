@@ -0,0 +1,214 @@
+"""Check the chatbot API's protections against a slow or hanging fake model.
+
+Requests go through the test client to /api/chatbot/, with Gemini replaced
+by a fake that counts its calls. Sessions and caches are swapped for
+private in-memory ones, the circuit breaker for a fresh one, and event
+retrieval is switched off, so the check never touches the database.
+
+- coalescing: ``--concurrency`` visitors, each with its own session and IP,
+  send the same opening question at the same moment. Exactly one model call
+  must be made, and every visitor must get its answer.
+- rate limit: one session sends its whole burst of messages, then one more,
+  which must be refused with 429 and a Retry-After header. The same is then
+  checked for many sessions sharing one IP.
+- circuit breaker: the fake model hangs. Each request must get a local
+  answer once ``--deadline-ms`` has passed, and the breaker must open after
+  its failure threshold. While it is open, requests must be answered
+  locally at once, with no model call. Once the model recovers and the
+  reset timeout has passed, one trial call must close the breaker again.
+
+    python manage.py check_chatbot --concurrency 50 --latency-ms 500
+"""
+import json
+import threading
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from events import chatbot, retrieval
+
+CHECK_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'check-chatbot-default'},
+    'chatbot': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'check-chatbot-answers'},
+}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class CountingModel:
+    """Stands in for genai.GenerativeModel: answers after ``latency`` seconds and counts calls."""
+
+    _model_name = 'check-chatbot'
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+        # Cleared to make calls hang until it is set again.
+        self.responsive = threading.Event()
+        self.responsive.set()
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        self.responsive.wait()
+        time.sleep(self.latency)
+        return FakeResponse('Open the Events page and press Book on the event you want.')
+
+
+class FakeGenAI:
+    def __init__(self, model):
+        self.model = model
+
+    def list_models(self):
+        return []
+
+    def GenerativeModel(self, name):
+        return self.model
+
+
+class Command(BaseCommand):
+    help = 'Check chatbot request coalescing, rate limiting and the circuit breaker against a fake model.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=20, help='Simultaneous identical requests.')
+        parser.add_argument('--latency-ms', type=float, default=300.0, help='Delay of the fake model.')
+        parser.add_argument('--deadline-ms', type=float, default=200.0,
+                            help='Chatbot deadline while the fake model hangs.')
+
+    def handle(self, *args, **options):
+        self.model = CountingModel(options['latency_ms'] / 1000)
+        self.url = reverse('events:chatbot_response')
+        self.failures = []
+        self.breaker = chatbot.CircuitBreaker(reset_timeout=1.0)
+        registry = chatbot.ModelRegistry(client=FakeGenAI(self.model))
+        try:
+            with override_settings(
+                    CACHES=CHECK_CACHES, ALLOWED_HOSTS=['testserver'],
+                    SESSION_ENGINE='django.contrib.sessions.backends.cache'), \
+                    mock.patch.object(chatbot, 'GEMINI_API_KEY', 'check'), \
+                    mock.patch.object(chatbot, 'model_registry', registry), \
+                    mock.patch.object(chatbot, 'circuit_breaker', self.breaker), \
+                    mock.patch.object(chatbot, 'response_cache', chatbot.ResponseCache(chatbot.SYSTEM_PROMPT)), \
+                    mock.patch.object(chatbot, 'retrieve_context', lambda message, previous='': ''), \
+                    mock.patch.object(retrieval, 'matching_events', lambda *args, **kwargs: []):
+                self.check_coalescing(options['concurrency'])
+                self.check_rate_limit()
+                with override_settings(CHATBOT_DEADLINE_SECONDS=options['deadline_ms'] / 1000):
+                    self.check_breaker(options['deadline_ms'] / 1000)
+        finally:
+            # Let hung fake calls return, so their pool threads can exit.
+            self.model.responsive.set()
+        if self.failures:
+            for failure in self.failures:
+                self.stderr.write(failure)
+            raise CommandError(f'{len(self.failures)} chatbot checks failed.')
+        self.stdout.write(self.style.SUCCESS('Chatbot coalescing, rate limiting and circuit breaker work.'))
+
+    def post(self, client, message, ip):
+        return client.post(self.url, json.dumps({'message': message}), content_type='application/json', REMOTE_ADDR=ip)
+
+    def check_coalescing(self, concurrency):
+        start = threading.Barrier(concurrency)
+        responses = [None] * concurrency
+
+        def visitor(i):
+            client = Client()
+            start.wait()
+            responses[i] = self.post(client, 'How do I book an event?', f'10.1.{i // 250}.{i % 250}')
+
+        calls_before = self.model.calls
+        started = time.monotonic()
+        threads = [threading.Thread(target=visitor, args=(i,)) for i in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+        calls = self.model.calls - calls_before
+        answered = sum(1 for r in responses if r is not None and r.status_code == 200 and r.json().get('success'))
+        self.stdout.write(
+            f'coalescing: {concurrency} identical requests, {calls} model calls, '
+            f'{answered} answered in {elapsed * 1000:.0f} ms'
+        )
+        if calls != 1:
+            self.failures.append(f'coalescing: expected 1 model call, got {calls}')
+        if answered != concurrency:
+            self.failures.append(f'coalescing: only {answered} of {concurrency} requests were answered')
+
+    def check_rate_limit(self):
+        config = settings.CHATBOT_RATE_LIMIT
+        if not config['ENABLED']:
+            self.stdout.write('rate limit: disabled in settings, skipped')
+            return
+        # Only request counts matter here, not model latency.
+        self.model.latency = 0
+        client = Client()
+        # The first message creates the session, so only the IP bucket sees it.
+        self.post(client, 'Hello', '10.2.0.1')
+        statuses = [
+            self.post(client, f'Question {i}', '10.2.0.1').status_code for i in range(config['BURST'])
+        ]
+        self.expect_limited('session', statuses, client, '10.2.0.1')
+
+        statuses = [
+            self.post(Client(), f'Question {i}', '10.3.0.1').status_code for i in range(config['IP_BURST'])
+        ]
+        self.expect_limited('IP', statuses, Client(), '10.3.0.1')
+
+    def expect_limited(self, scope, statuses, client, ip):
+        refused = self.post(client, 'One more question', ip)
+        retry_after = refused.get('Retry-After')
+        self.stdout.write(
+            f'rate limit ({scope}): {statuses.count(200)} allowed, then {refused.status_code} '
+            f'with Retry-After {retry_after}'
+        )
+        if statuses.count(200) != len(statuses):
+            self.failures.append(f'rate limit ({scope}): requests within the burst were refused: {statuses}')
+        if refused.status_code != 429 or not retry_after or int(retry_after) < 1:
+            self.failures.append(f'rate limit ({scope}): over-limit request was not refused with Retry-After')
+
+    def ask(self, message, ip):
+        """(milliseconds, answer text) for an opening question from a new visitor."""
+        started = time.monotonic()
+        response = self.post(Client(), message, ip)
+        elapsed = (time.monotonic() - started) * 1000
+        return elapsed, response.json().get('response', '') if response.status_code == 200 else ''
+
+    def check_breaker(self, deadline):
+        self.model.latency = 0
+        self.model.responsive.clear()
+        local = chatbot.faq_responder.answer('How do I book a seat?')
+        for i in range(self.breaker.failure_threshold):
+            elapsed, answer = self.ask('How do I book a seat?', f'10.4.0.{i}')
+            if answer != local or elapsed > deadline * 1000 + 500:
+                self.failures.append(
+                    f'circuit breaker: hung call {i + 1} took {elapsed:.0f} ms and answered {answer[:40]!r}'
+                )
+        stats = self.breaker.stats()
+        self.stdout.write(f'circuit breaker: {stats["timeouts"]} timeouts, state {stats["state"]}')
+        if stats['state'] != chatbot.CircuitBreaker.OPEN:
+            self.failures.append(f'circuit breaker: still {stats["state"]} after {stats["timeouts"]} timeouts')
+            return
+
+        calls_before = self.model.calls
+        elapsed, answer = self.ask('How do I book a seat?', '10.4.1.1')
+        self.stdout.write(f'circuit breaker: open, answered locally in {elapsed:.1f} ms')
+        if self.model.calls != calls_before or answer != local or elapsed > deadline * 1000 / 2:
+            self.failures.append('circuit breaker: open breaker did not answer locally at once')
+
+        self.model.responsive.set()
+        time.sleep(self.breaker.reset_timeout)
+        self.ask('Where can I see photos?', '10.4.2.1')
+        stats = self.breaker.stats()
+        self.stdout.write(f'circuit breaker: after recovery {stats}')
+        if stats['state'] != chatbot.CircuitBreaker.CLOSED:
+            self.failures.append(f'circuit breaker: trial call left it {stats["state"]}')
@@ -0,0 +1,247 @@
+"""Generate large, reproducible synthetic datasets for load and scaling tests.
+
+Rows are built in memory a chunk at a time and written with bulk_create, one
+transaction per chunk, so memory stays flat however many rows are requested.
+The same --seed and --prefix always produce the same data.
+
+    python manage.py generate_fake_data --users 100000 --events 20000 --registrations 1000000
+"""
+import datetime
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from events import booking, geo, home_cache, reviews, search
+from events.interests import city_key, interests_to_mask
+from events.models import Event, Profile, Registration, Review, Wishlist
+
+CITIES = [
+    'Mumbai', 'Delhi', 'Bangalore', 'Hyderabad', 'Chennai', 'Kolkata', 'Pune',
+    'Ahmedabad', 'Jaipur', 'Goa', 'Kochi', 'Chandigarh', 'Lucknow', 'Indore',
+]
+TITLE_WORDS = {
+    'music': ['Live', 'Jazz', 'Indie', 'Rock', 'Classical', 'Music Festival', 'Concert'],
+    'tech': ['AI', 'Cloud', 'Python', 'Startup', 'Tech Talk', 'Hackathon', 'DevOps'],
+    'sports': ['Marathon', 'Yoga', 'Cycling', 'Football', 'Fitness Bootcamp', 'Cricket'],
+    'arts': ['Painting', 'Theatre', 'Photography', 'Art Workshop', 'Poetry', 'Dance'],
+    'food': ['Street Food', 'Wine Tasting', 'Baking', 'Food Festival', 'Coffee Cupping'],
+    'business': ['Networking', 'Founders', 'Investor Panel', 'Leadership', 'Marketing'],
+    'education': ['Bootcamp', 'Masterclass', 'Seminar', 'Study Group', 'Career Fair'],
+    'social': ['Meetup', 'Community Picnic', 'Volunteering', 'Board Games', 'Open Mic'],
+}
+CATEGORIES = list(TITLE_WORDS)
+SUFFIXES = ['Night', 'Summit', 'Weekend', 'Workshop', 'Expo', 'Session', 'Carnival', 'Meetup']
+COMMENTS = ['Loved it!', 'Well organised.', 'Could be better.', 'Great speakers.', 'Would attend again.', '']
+
+
+def _pair(k, n_users, n_events):
+    """Map the k-th row to a distinct (user index, event index) pair.
+
+    For a fixed user the event index walks k // n_users, so no pair repeats
+    while k < n_users * n_events. The per-user offset spreads users over
+    different events.
+    """
+    u = k % n_users
+    e = (k // n_users + u * 7919) % n_events
+    return u, e
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, profiles, events, registrations, reviews and wishlist rows with bulk_create.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--organisers', type=float, default=0.05, help='Fraction of users who are organisers.')
+        parser.add_argument('--events', type=int, default=200)
+        parser.add_argument('--registrations', type=int, default=5000)
+        parser.add_argument('--reviews', type=int, default=1000)
+        parser.add_argument('--wishlists', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--prefix', default='fake', help='Prefix for generated usernames and event slugs.')
+        parser.add_argument('--flush', action='store_true', help='Delete rows from an earlier run with the same prefix first.')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.chunk_size = options['chunk_size']
+        self.prefix = options['prefix']
+        n_users, n_events = options['users'], options['events']
+        if n_users < 1 or n_events < 1:
+            raise CommandError('--users and --events must be at least 1.')
+
+        users = User.objects.filter(username__startswith=f'{self.prefix}_')
+        events = Event.objects.filter(slug__startswith=f'{self.prefix}-')
+        if options['flush']:
+            self.timed('flush', lambda: (events.delete()[0], users.delete()[0]))
+        elif users.exists() or events.exists():
+            raise CommandError(f'Rows with prefix "{self.prefix}" already exist. Use --flush or another --prefix.')
+
+        started = time.monotonic()
+        total = 0
+        total += self.timed('users', lambda: self.create_users(n_users))
+        user_ids = list(users.order_by('id').values_list('id', flat=True))
+        total += self.timed('profiles', lambda: self.create_profiles(user_ids, options['organisers']))
+        organiser_ids = list(
+            Profile.objects.filter(user__username__startswith=f'{self.prefix}_', is_organiser=True)
+            .order_by('user_id').values_list('user_id', flat=True)
+        ) or user_ids[:1]
+        total += self.timed('events', lambda: self.create_events(n_events, organiser_ids))
+        event_ids = list(events.order_by('id').values_list('id', flat=True))
+
+        max_pairs = len(user_ids) * len(event_ids)
+        for label, count in (('registrations', options['registrations']), ('reviews', options['reviews']), ('wishlists', options['wishlists'])):
+            if count > max_pairs:
+                raise CommandError(f'--{label} cannot exceed users x events ({max_pairs}).')
+        total += self.timed('registrations', lambda: self.create_registrations(options['registrations'], user_ids, event_ids))
+        total += self.timed('reviews', lambda: self.create_reviews(options['reviews'], user_ids, event_ids))
+        total += self.timed('wishlists', lambda: self.create_wishlists(options['wishlists'], user_ids, event_ids))
+
+        self.timed('seat counters', lambda: self.sync_seats(events))
+        self.timed('rating totals', lambda: reviews.rebuild(events))
+        self.timed('search index', search.rebuild_index)
+        home_cache.invalidate()
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/s).'
+        ))
+
+    def timed(self, label, func):
+        started = time.monotonic()
+        result = func()
+        elapsed = time.monotonic() - started
+        if isinstance(result, int):
+            rate = result / elapsed if elapsed else 0
+            self.stdout.write(f'{label}: {result} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)')
+        else:
+            self.stdout.write(f'{label}: done in {elapsed:.2f}s')
+        return result if isinstance(result, int) else 0
+
+    def bulk_insert(self, model, rows):
+        """bulk_create an iterable of unsaved instances, one transaction per chunk."""
+        count = 0
+        chunk = []
+        for obj in rows:
+            chunk.append(obj)
+            if len(chunk) >= self.chunk_size:
+                with transaction.atomic():
+                    model.objects.bulk_create(chunk, batch_size=self.chunk_size)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, batch_size=self.chunk_size)
+            count += len(chunk)
+        return count
+
+    def create_users(self, n):
+        password = make_password('password123')
+        now = timezone.now()
+        return self.bulk_insert(User, (
+            User(
+                username=f'{self.prefix}_{i}', email=f'{self.prefix}_{i}@example.com',
+                password=password, date_joined=now,
+            )
+            for i in range(n)
+        ))
+
+    def create_profiles(self, user_ids, organiser_fraction):
+        rng = self.rng
+
+        def rows():
+            for i, user_id in enumerate(user_ids):
+                organiser = rng.random() < organiser_fraction
+                city = rng.choice(CITIES)
+                interests = rng.sample(CATEGORIES, rng.randint(0, 3))
+                # bulk_create skips Profile.save(), so fill the indexed copies here.
+                yield Profile(
+                    user_id=user_id,
+                    full_name=f'Fake User {i}',
+                    city=city,
+                    city_key=city_key(city),
+                    interests=','.join(interests),
+                    interest_mask=interests_to_mask(interests),
+                    role='organiser' if organiser else 'attendee',
+                    is_organiser=organiser,
+                )
+        return self.bulk_insert(Profile, rows())
+
+    def create_events(self, n, organiser_ids):
+        rng = self.rng
+        today = datetime.date.today()
+
+        def rows():
+            for i in range(n):
+                category = rng.choice(CATEGORIES)
+                city = rng.choice(CITIES)
+                title = f'{rng.choice(TITLE_WORDS[category])} {rng.choice(SUFFIXES)} {city}'
+                # Scatter venues up to ~15 km around the city centre.
+                _, lat, lon = geo.locate(city)
+                lat += rng.uniform(-0.13, 0.13)
+                lon += rng.uniform(-0.13, 0.13)
+                yield Event(
+                    title=title,
+                    slug=f'{self.prefix}-{i}',
+                    category=category,
+                    short_description=f'A {category} event in {city}.',
+                    description=f'{title}. Join fellow {category} enthusiasts in {city} for a day of talks, '
+                                f'activities and networking.',
+                    highlights=', '.join(rng.sample(['Food', 'Parking', 'Live music', 'Workshops', 'Certificate', 'Networking'], 3)),
+                    date=today + datetime.timedelta(days=rng.randint(-60, 365)),
+                    time=datetime.time(rng.randint(8, 21), rng.choice([0, 30])),
+                    location=f'{city}, India',
+                    latitude=lat,
+                    longitude=lon,
+                    geohash=geo.encode(lat, lon),
+                    organiser_id=rng.choice(organiser_ids),
+                    capacity=rng.choice([0, 50, 100, 250, 500, 1000, 5000]),
+                    is_published=rng.random() < 0.95,
+                )
+        return self.bulk_insert(Event, rows())
+
+    def create_registrations(self, n, user_ids, event_ids):
+        rng = self.rng
+
+        def rows():
+            for k in range(n):
+                u, e = _pair(k, len(user_ids), len(event_ids))
+                student = rng.random() < 0.5
+                yield Registration(
+                    user_id=user_ids[u], event_id=event_ids[e],
+                    full_name=f'Fake User {u}', email=f'{self.prefix}_{u}@example.com',
+                    age=rng.randint(17, 60), category='student' if student else 'working',
+                    college_name='Fake University' if student else '',
+                    graduation_year=rng.randint(2024, 2030) if student else None,
+                    terms_agreed=True, cancelled=rng.random() < 0.03,
+                )
+        return self.bulk_insert(Registration, rows())
+
+    def create_reviews(self, n, user_ids, event_ids):
+        rng = self.rng
+        # Offset k so reviews are not just the first registrations' pairs.
+        return self.bulk_insert(Review, (
+            Review(
+                user_id=user_ids[u], event_id=event_ids[e],
+                rating=rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 4, 8, 10])[0],
+                comment=rng.choice(COMMENTS),
+            )
+            for u, e in (_pair(k + len(user_ids), len(user_ids), len(event_ids)) for k in range(n))
+        ))
+
+    def create_wishlists(self, n, user_ids, event_ids):
+        return self.bulk_insert(Wishlist, (
+            Wishlist(user_id=user_ids[u], event_id=event_ids[e])
+            for u, e in (_pair(k + 2 * len(user_ids), len(user_ids), len(event_ids)) for k in range(n))
+        ))
+
+    def sync_seats(self, events):
+        booking.rebuild(events)
+        # Random registrations can overfill an event; raise capacity to match.
+        events.filter(capacity__gt=0).update(capacity=Greatest(F('capacity'), F('seats_taken')))
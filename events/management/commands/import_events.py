@@ -0,0 +1,48 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from events import importer
+
+
+class Command(BaseCommand):
+    help = 'Import events from a CSV or JSON-lines file, validating each row with EventForm.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--organiser', required=True, help='Username that will own the imported events.')
+        parser.add_argument('--format', choices=importer.FORMATS, help='Defaults to the file extension.')
+        parser.add_argument('--chunk-size', type=int, default=importer.CHUNK_SIZE)
+        parser.add_argument('--unpublished', action='store_true', help='Import events as drafts.')
+        parser.add_argument('--dry-run', action='store_true', help='Validate only; write nothing.')
+        parser.add_argument('--report', help='Write the per-row error report to this JSON file.')
+
+    def handle(self, *args, **options):
+        try:
+            organiser = User.objects.get(username=options['organiser'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user named {options["organiser"]!r}.')
+        try:
+            fmt = options['format'] or importer.detect_format(options['path'])
+            with open(options['path'], 'rb') as f:
+                report = importer.import_file(
+                    f, fmt, organiser, publish=not options['unpublished'],
+                    chunk_size=options['chunk_size'], dry_run=options['dry_run'],
+                )
+        except (OSError, importer.ImportFormatError) as e:
+            raise CommandError(str(e))
+
+        for row, errors in report.errors:
+            for field, messages in errors.items():
+                self.stderr.write(f'row {row}: {field}: {" ".join(messages)}')
+        if report.truncated:
+            self.stderr.write(f'... {report.error_count - len(report.errors)} more errors not shown.')
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report.as_dict(), f, indent=2)
+        verb = 'Validated' if options['dry_run'] else 'Imported'
+        count = report.rows - report.error_count if options['dry_run'] else report.created
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {count} of {report.rows} rows; {report.error_count} rows had errors.'
+        ))
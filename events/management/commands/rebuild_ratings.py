@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from events import home_cache, reviews
+from events.models import Event
+
+MAX_REPORTED = 20
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute Event.rating_sum/rating_count from the reviews table. '
+        'With --check, only report events whose totals have drifted and fail if any have.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help='Report drift instead of fixing it.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['check']:
+            self.check()
+        else:
+            self.rebuild(options['chunk_size'])
+
+    def check(self):
+        drifted = list(reviews.drift()[:MAX_REPORTED + 1])
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('Rating totals match the reviews table.'))
+            return
+        for row in drifted[:MAX_REPORTED]:
+            self.stderr.write(
+                f'event {row["pk"]}: stored {row["rating_sum"]}/{row["rating_count"]}, '
+                f'actual {row["actual_sum"]}/{row["actual_count"]}'
+            )
+        more = ' (showing the first %d)' % MAX_REPORTED if len(drifted) > MAX_REPORTED else ''
+        raise CommandError(f'Rating totals have drifted{more}; run rebuild_ratings to fix them.')
+
+    def rebuild(self, chunk_size):
+        ids = Event.objects.order_by('pk').values_list('pk', flat=True)
+        last_pk, updated = 0, 0
+        while True:
+            # One short transaction per chunk of events, so review writes are
+            # never blocked for long.
+            chunk = list(ids.filter(pk__gt=last_pk)[:chunk_size])
+            if not chunk:
+                break
+            with transaction.atomic():
+                updated += reviews.rebuild(Event.objects.filter(pk__gte=chunk[0], pk__lte=chunk[-1]))
+            last_pk = chunk[-1]
+        home_cache.invalidate()
+        self.stdout.write(self.style.SUCCESS(f'Recomputed rating totals for {updated} events.'))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from events import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for events (needed after bulk writes that skip signals).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not search.is_sqlite():
+            self.stdout.write('Search index is only materialised on SQLite; nothing to do.')
+            return
+        count = search.rebuild_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} events.'))
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.1 on 2026-02-05 01:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registration',
+            name='age',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='category',
+            field=models.CharField(choices=[('student', 'Student'), ('working', 'Working Professional')], default='student', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='college_name',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='email',
+            field=models.EmailField(blank=True, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='full_name',
+            field=models.CharField(blank=True, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='graduation_year',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='phone_number',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='registration',
+            name='terms_agreed',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+from events import search
+
+
+def create_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if not search.is_sqlite(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(search.CREATE_FTS_SQL)
+    Event = apps.get_model('events', 'Event')
+    search.rebuild_index(Event.objects.using(conn.alias).only('id', *search.FIELDS).order_by('pk'), conn=conn)
+
+
+def drop_search_index(apps, schema_editor):
+    conn = schema_editor.connection
+    if not search.is_sqlite(conn):
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(search.DROP_FTS_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_add_profile_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,39 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def backfill_seats_taken(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Registration = apps.get_model('events', 'Registration')
+    db = schema_editor.connection.alias
+    active = Registration.objects.using(db).filter(cancelled=False)
+
+    # Keep the earliest active registration per (user, event) and cancel any
+    # duplicates so the unique_active_registration constraint can be created.
+    dupes = active.values('user_id', 'event_id').annotate(n=Count('id'), keep=Min('id')).filter(n__gt=1)
+    for row in dupes:
+        active.filter(user_id=row['user_id'], event_id=row['event_id']).exclude(id=row['keep']).update(cancelled=True)
+
+    for row in active.values('event_id').annotate(n=Count('id')):
+        Event.objects.using(db).filter(pk=row['event_id']).update(seats_taken=row['n'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_registration_age_registration_category_and_more'),
+        ('events', '0003_event_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='seats_taken',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_seats_taken, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='registration',
+            constraint=models.UniqueConstraint(condition=models.Q(('cancelled', False)), fields=('user', 'event'), name='unique_active_registration'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='category',
+            field=models.CharField(blank=True, choices=[('music', 'Music & Concerts'), ('tech', 'Technology & Tech Talks'), ('sports', 'Sports & Fitness'), ('arts', 'Arts & Culture'), ('food', 'Food & Dining'), ('business', 'Business & Networking'), ('education', 'Education & Learning'), ('social', 'Social & Community')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,50 @@
+from django.db import migrations, models
+
+from events.interests import city_key, interests_to_mask
+
+
+def backfill_interest_mask(apps, schema_editor):
+    Profile = apps.get_model('events', 'Profile')
+    db = schema_editor.connection.alias
+    profiles = Profile.objects.using(db).only('id', 'interests', 'city').order_by('pk')
+    last_pk = 0
+    while True:
+        # Chunks are read by primary key rather than with iterator(), since
+        # SQLite cannot safely update a table while a cursor is open on it.
+        batch = list(profiles.filter(pk__gt=last_pk)[:2000])
+        if not batch:
+            break
+        for profile in batch:
+            profile.interest_mask = interests_to_mask(profile.interests)
+            profile.city_key = city_key(profile.city)
+        Profile.objects.using(db).bulk_update(batch, ['interest_mask', 'city_key'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0007_event_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='city_key',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='profile',
+            name='interest_mask',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_interest_mask, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['city_key', 'interest_mask'], name='profile_city_interest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['interest_mask'], name='profile_interest_idx'),
+        ),
+    ]
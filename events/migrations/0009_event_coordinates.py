@@ -0,0 +1,48 @@
+from django.db import migrations, models
+
+from events import geo
+
+
+def geocode_events(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    db = schema_editor.connection.alias
+    events = Event.objects.using(db).only('id', 'location', 'latitude', 'longitude', 'geohash').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(events.filter(pk__gt=last_pk)[:2000])
+        if not batch:
+            break
+        for event in batch:
+            geo.fill_coordinates(event)
+        Event.objects.using(db).bulk_update(batch, ['latitude', 'longitude', 'geohash'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0008_profile_interest_mask'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='geohash',
+            field=models.CharField(blank=True, default='', max_length=12),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(geocode_events, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['geohash'], name='event_geohash_idx'),
+        ),
+    ]
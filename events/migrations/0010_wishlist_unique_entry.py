@@ -0,0 +1,33 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_entries(apps, schema_editor):
+    Wishlist = apps.get_model('events', 'Wishlist')
+    db = schema_editor.connection.alias
+    duplicates = (
+        Wishlist.objects.using(db)
+        .values('user_id', 'event_id')
+        .annotate(first_pk=Min('pk'), n=Count('pk'))
+        .filter(n__gt=1)
+    )
+    for row in list(duplicates):
+        # Keep the oldest entry so its added_at survives.
+        Wishlist.objects.using(db).filter(
+            user_id=row['user_id'], event_id=row['event_id'], pk__gt=row['first_pk'],
+        ).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_event_coordinates'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_entries, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='wishlist',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_wishlist_entry'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_rating_totals(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Review = apps.get_model('events', 'Review')
+    db = schema_editor.connection.alias
+    reviews = Review.objects.using(db).filter(event=OuterRef('pk')).order_by().values('event')
+    Event.objects.using(db).filter(pk__in=Review.objects.using(db).values('event')).update(
+        rating_sum=Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s')), Value(0)),
+        rating_count=Coalesce(Subquery(reviews.annotate(n=Count('pk')).values('n')), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_wishlist_unique_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_rating_totals, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='event',
+            name='rating_rank',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('rating_sum'), '+', models.Value(9.0)), '/', django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.NullIf(models.F('rating_count'), 0), '+', models.Value(3))), '*', models.Value(-1)), output_field=models.FloatField()),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['rating_rank', 'id'], name='event_pub_rating_idx'),
+        ),
+    ]
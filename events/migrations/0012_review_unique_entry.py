@@ -0,0 +1,42 @@
+from django.db import migrations, models
+from django.db.models import Count, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    Review = apps.get_model('events', 'Review')
+    db = schema_editor.connection.alias
+    duplicates = list(
+        Review.objects.using(db)
+        .filter(user__isnull=False)
+        .values('user_id', 'event_id')
+        .annotate(first_pk=Min('pk'), n=Count('pk'))
+        .filter(n__gt=1)
+    )
+    for row in duplicates:
+        # Keep the oldest review, the one submit_review has been editing.
+        Review.objects.using(db).filter(
+            user_id=row['user_id'], event_id=row['event_id'], pk__gt=row['first_pk'],
+        ).delete()
+    # The deleted reviews were counted in their events' rating totals.
+    reviews = Review.objects.using(db).filter(event=OuterRef('pk')).order_by().values('event')
+    Event.objects.using(db).filter(pk__in={row['event_id'] for row in duplicates}).update(
+        rating_sum=Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s')), Value(0)),
+        rating_count=Coalesce(Subquery(reviews.annotate(n=Count('pk')).values('n')), Value(0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_event_rating_totals'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('user', 'event'), name='unique_review'),
+        ),
+    ]
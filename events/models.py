@@ -1,21 +1,21 @@
 from django.db import models
 from django.contrib.auth.models import User
-from django.utils.text import slugify
+from django.db.models.functions import NullIf
 from django.utils import timezone
 
+from . import geo
+from .interests import CATEGORY_CHOICES, city_key as normalise_city, interests_to_mask
+from .slugs import unique_slug
+
+RATING_PRIOR_COUNT = 3
+RATING_PRIOR_MEAN = 3.0
+# Event fields geo.fill_coordinates compares with their loaded values.
+PLACE_FIELDS = ('location', 'latitude', 'longitude')
+
 
 class Profile(models.Model):
     ROLE_CHOICES = [('attendee', 'Attendee'), ('organiser', 'Organiser')]
-    CATEGORY_CHOICES = [
-        ('music', 'Music & Concerts'),
-        ('tech', 'Technology & Tech Talks'),
-        ('sports', 'Sports & Fitness'),
-        ('arts', 'Arts & Culture'),
-        ('food', 'Food & Dining'),
-        ('business', 'Business & Networking'),
-        ('education', 'Education & Learning'),
-        ('social', 'Social & Community'),
-    ]
+    CATEGORY_CHOICES = CATEGORY_CHOICES
     
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     full_name = models.CharField(max_length=100, blank=True)
@@ -25,9 +25,26 @@ class Profile(models.Model):
     is_organiser = models.BooleanField(default=False)
     city = models.CharField(max_length=100, blank=True)
     interests = models.CharField(max_length=500, blank=True)  # Comma-separated categories
+    # Indexed copies of interests and city, kept in sync by save().
+    interest_mask = models.PositiveSmallIntegerField(default=0)
+    city_key = models.CharField(max_length=100, blank=True, default='')
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['city_key', 'interest_mask'], name='profile_city_interest_idx'),
+            models.Index(fields=['interest_mask'], name='profile_interest_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.interest_mask = interests_to_mask(self.interests)
+        self.city_key = normalise_city(self.city)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'interest_mask', 'city_key'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.user.username
 
@@ -38,19 +55,84 @@ class Event(models.Model):
     short_description = models.TextField(blank=True)
     description = models.TextField(blank=True)
     highlights = models.TextField(blank=True)
+    category = models.CharField(max_length=20, choices=CATEGORY_CHOICES, blank=True)
     image_url = models.URLField(blank=True)
     date = models.DateField(null=True, blank=True)
     time = models.TimeField(null=True, blank=True)
     location = models.CharField(max_length=255, blank=True)
+    # Filled from the offline gazetteer when left empty (see events/geo.py).
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default='')
     organiser = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='organised_events')
-    capacity = models.IntegerField(default=0)
+    capacity = models.IntegerField(default=0)  # 0 means no seat limit
+    seats_taken = models.PositiveIntegerField(default=0)  # Active registrations, maintained by events.booking
+    # Review totals, maintained by events.reviews.
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    # "Top rated" sort key, computed by the database: lower is better, NULL
+    # without reviews. The average is pulled towards RATING_PRIOR_MEAN as if
+    # there were RATING_PRIOR_COUNT extra reviews, so one 5-star review does
+    # not outrank a hundred 4.8s.
+    rating_rank = models.GeneratedField(
+        expression=-(
+            (models.F('rating_sum') + models.Value(RATING_PRIOR_COUNT * RATING_PRIOR_MEAN))
+            / (NullIf(models.F('rating_count'), 0) + models.Value(RATING_PRIOR_COUNT))
+        ),
+        output_field=models.FloatField(),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     is_published = models.BooleanField(default=True)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets save() notice an edited location; unknown when any is deferred.
+        loaded = dict(zip(field_names, values))
+        if all(name in loaded for name in PLACE_FIELDS):
+            instance._loaded_place = tuple(loaded[name] for name in PLACE_FIELDS)
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.title)[:220]
+            self.slug = unique_slug(self.title)
+        geo.fill_coordinates(self, getattr(self, '_loaded_place', None))
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'latitude', 'longitude', 'geohash'}
         super().save(*args, **kwargs)
+        if not self.get_deferred_fields().intersection(PLACE_FIELDS):
+            self._loaded_place = tuple(getattr(self, name) for name in PLACE_FIELDS)
+
+    class Meta:
+        indexes = [
+            # Public listings: published events by date (event_list, home
+            # page "featured") and by creation time (home page "latest").
+            models.Index(fields=['date', 'id'], condition=models.Q(is_published=True), name='event_pub_date_idx'),
+            models.Index(fields=['created_at'], condition=models.Q(is_published=True), name='event_pub_created_idx'),
+            # Radius searches scan geohash ranges (events/geo.py). Not
+            # partial: SQLite only turns the OR of ranges into index
+            # searches when the index needs no extra WHERE to apply.
+            models.Index(fields=['geohash'], name='event_geohash_idx'),
+            models.Index(fields=['rating_rank', 'id'], condition=models.Q(is_published=True), name='event_pub_rating_idx'),
+        ]
+
+    @property
+    def seats_left(self):
+        if self.capacity <= 0:
+            return None
+        return max(self.capacity - self.seats_taken, 0)
+
+    @property
+    def is_sold_out(self):
+        return self.capacity > 0 and self.seats_taken >= self.capacity
+
+    @property
+    def rating_average(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
 
     def __str__(self):
         return self.title
@@ -72,6 +154,20 @@ class Registration(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     cancelled = models.BooleanField(default=False)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'event'],
+                condition=models.Q(cancelled=False),
+                name='unique_active_registration',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'event', 'cancelled'], name='reg_user_event_idx'),
+            # Organiser views list an event's registrations newest first.
+            models.Index(fields=['event', '-created_at'], name='reg_event_created_idx'),
+        ]
+
     def __str__(self):
         return f"{self.full_name or self.user.username} -> {self.event.title}"
 
@@ -81,12 +177,23 @@ class Wishlist(models.Model):
     event = models.ForeignKey(Event, on_delete=models.CASCADE)
     added_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # Makes saving idempotent under concurrent clicks (events/wishlist.py).
+            models.UniqueConstraint(fields=['user', 'event'], name='unique_wishlist_entry'),
+        ]
+
 
 class Testimonial(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
     text = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='testimonial_created_idx'),
+        ]
+
 
 class Review(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
@@ -94,3 +201,51 @@ class Review(models.Model):
     rating = models.IntegerField(default=5)
     comment = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # One review per user and event, even under a double submit (events/reviews.py).
+            models.UniqueConstraint(fields=['user', 'event'], name='unique_review'),
+        ]
+
+    @property
+    def stars(self):
+        return '★' * self.rating
+
+
+class OutboundEmail(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    to = models.TextField()  # Comma-separated recipient addresses
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claimed_by = models.CharField(max_length=64, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    @property
+    def recipients(self):
+        return [addr for addr in self.to.split(',') if addr]
+
+    def __str__(self):
+        return f"{self.subject} -> {self.to} ({self.status})"
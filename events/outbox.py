@@ -0,0 +1,113 @@
+"""Persistent outbound email queue.
+
+Views call ``queue_mail()``, which only inserts an OutboundEmail row. The
+``send_queued_mail`` management command drains the queue with
+``deliver_pending()``: it claims a batch with a conditional UPDATE (so several
+workers never send the same message), sends the batch over one SMTP
+connection and reschedules failures with exponential backoff.
+"""
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from . import telemetry
+from .models import OutboundEmail
+
+MAX_ATTEMPTS = getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 6)
+BACKOFF_BASE_SECONDS = getattr(settings, 'OUTBOX_BACKOFF_BASE_SECONDS', 30)
+BACKOFF_MAX_SECONDS = getattr(settings, 'OUTBOX_BACKOFF_MAX_SECONDS', 60 * 60)
+# A claim older than this is assumed to belong to a crashed worker.
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def queue_mail(subject, body, from_email, recipient_list):
+    """Store a message for background delivery. Returns the OutboundEmail, or None if there is no recipient."""
+    recipients = [addr for addr in recipient_list if addr]
+    if not recipients:
+        return None
+    return OutboundEmail.objects.create(
+        subject=subject[:255],
+        body=body,
+        from_email=from_email,
+        to=','.join(recipients),
+    )
+
+
+def backoff_delay(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS))
+
+
+def release_stale_claims(now=None):
+    now = now or timezone.now()
+    return OutboundEmail.objects.filter(
+        status=OutboundEmail.STATUS_SENDING, claimed_at__lt=now - CLAIM_TIMEOUT,
+    ).update(status=OutboundEmail.STATUS_PENDING, claimed_by='')
+
+
+def claim_batch(batch_size, now=None):
+    now = now or timezone.now()
+    token = uuid.uuid4().hex
+    due = (
+        OutboundEmail.objects
+        .filter(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now)
+        .order_by('next_attempt_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    OutboundEmail.objects.filter(pk__in=list(due), status=OutboundEmail.STATUS_PENDING).update(
+        status=OutboundEmail.STATUS_SENDING, claimed_by=token, claimed_at=now,
+    )
+    return list(OutboundEmail.objects.filter(claimed_by=token, status=OutboundEmail.STATUS_SENDING).order_by('id'))
+
+
+def _mark_failed(message, error, max_attempts, now):
+    message.attempts += 1
+    message.last_error = str(error)[:2000]
+    message.claimed_by = ''
+    if message.attempts >= max_attempts:
+        message.status = OutboundEmail.STATUS_FAILED
+    else:
+        message.status = OutboundEmail.STATUS_PENDING
+        message.next_attempt_at = now + backoff_delay(message.attempts)
+    message.save(update_fields=['attempts', 'last_error', 'claimed_by', 'status', 'next_attempt_at'])
+    telemetry.emit('outbox.send_failed', level='warning', id=message.pk, attempts=message.attempts, error=message.last_error)
+
+
+def deliver_pending(batch_size=100, max_attempts=MAX_ATTEMPTS, connection=None):
+    """Send one batch of due messages. Returns (sent, failed) counts."""
+    release_stale_claims()
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection(fail_silently=False)
+    now = timezone.now()
+    sent = failed = 0
+    try:
+        connection.open()
+    except Exception as e:
+        for message in batch:
+            _mark_failed(message, e, max_attempts, now)
+        return 0, len(batch)
+
+    try:
+        for message in batch:
+            email = EmailMessage(message.subject, message.body, message.from_email, message.recipients, connection=connection)
+            try:
+                email.send()
+            except Exception as e:
+                _mark_failed(message, e, max_attempts, now)
+                failed += 1
+                continue
+            OutboundEmail.objects.filter(pk=message.pk).update(
+                status=OutboundEmail.STATUS_SENT, sent_at=timezone.now(), attempts=message.attempts + 1,
+                claimed_by='', last_error='',
+            )
+            sent += 1
+    finally:
+        connection.close()
+
+    telemetry.emit('outbox.batch_delivered', sent=sent, failed=failed)
+    return sent, failed
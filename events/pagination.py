@@ -0,0 +1,102 @@
+"""Keyset (cursor) pagination.
+
+Pages are fetched with ``WHERE (key, id) > (last_key, last_id) ORDER BY key,
+id LIMIT n`` instead of OFFSET, so page N costs the same as page 1 given an
+index on the key. The key field may be nullable; NULLs sort last.
+Cursors are opaque URL-safe strings encoding the boundary row's (key, id).
+"""
+import base64
+import json
+from datetime import date
+
+from django.db.models import F, Q
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.prev_cursor is not None
+
+
+def encode_cursor(value, pk):
+    if isinstance(value, date):
+        value = value.isoformat()
+    raw = json.dumps([value, pk], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, parse=None):
+    """Return (value, pk), or None for a malformed cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        value, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if value is not None and parse is not None:
+            value = parse(value)
+        return value, int(pk)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def _after(key, value, pk):
+    if value is None:
+        return Q(**{f'{key}__isnull': True, 'pk__gt': pk})
+    return Q(**{f'{key}__gt': value}) | Q(**{key: value, 'pk__gt': pk}) | Q(**{f'{key}__isnull': True})
+
+
+def _before(key, value, pk):
+    if value is None:
+        return Q(**{f'{key}__isnull': False}) | Q(**{f'{key}__isnull': True, 'pk__lt': pk})
+    return Q(**{f'{key}__lt': value}) | Q(**{key: value, 'pk__lt': pk})
+
+
+def keyset_paginate(qs, key, page_size, after=None, before=None, parse=None):
+    """Return one KeysetPage of ``qs`` ordered by (key ASC NULLS LAST, pk)."""
+    forward = (F(key).asc(nulls_last=True), 'pk')
+    backward = (F(key).desc(nulls_first=True), '-pk')
+
+    boundary = None
+    if before:
+        boundary = decode_cursor(before, parse)
+    elif after:
+        boundary = decode_cursor(after, parse)
+    going_back = bool(before) and boundary is not None
+
+    if boundary is None:
+        rows = list(qs.order_by(*forward)[:page_size + 1])
+    elif going_back:
+        rows = list(qs.filter(_before(key, *boundary)).order_by(*backward)[:page_size + 1])
+    else:
+        rows = list(qs.filter(_after(key, *boundary)).order_by(*forward)[:page_size + 1])
+
+    more = len(rows) > page_size
+    rows = rows[:page_size]
+    if going_back:
+        rows.reverse()
+
+    def cursor_for(obj):
+        return encode_cursor(getattr(obj, key), obj.pk)
+
+    page = KeysetPage(rows)
+    if rows:
+        if going_back:
+            page.next_cursor = cursor_for(rows[-1])
+            page.prev_cursor = cursor_for(rows[0]) if more else None
+        else:
+            page.next_cursor = cursor_for(rows[-1]) if more else None
+            page.prev_cursor = cursor_for(rows[0]) if boundary is not None else None
+    return page
@@ -0,0 +1,168 @@
+"""Opt-in per-request profiling.
+
+``ProfilingMiddleware`` times the whole request, every SQL query (through a
+connection execute wrapper), template rendering and any named ``span()`` the
+code opens, such as the upstream LLM call in chatbot.py. The totals are sent
+back as a ``Server-Timing`` header, and a sampled share of requests is also
+emitted as a ``profiling.request`` telemetry record.
+
+Configured through ``settings.PROFILING``::
+
+    PROFILING = {
+        'ENABLED': False,        # off: the middleware removes itself at startup
+        'SERVER_TIMING': True,   # add the Server-Timing header
+        'SAMPLE_RATE': 0.0,      # fraction of requests emitted to telemetry
+    }
+
+When profiling is off, the middleware is dropped from the chain and
+``span()`` costs one context variable lookup. Queries run while a template
+renders lazily count towards both ``db`` and ``tpl``.
+"""
+import random
+import threading
+import time
+from contextlib import ExitStack, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import telemetry
+
+DEFAULTS = {
+    'ENABLED': False,
+    'SERVER_TIMING': True,
+    'SAMPLE_RATE': 0.0,
+}
+
+_current = ContextVar('events_profile', default=None)
+
+
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.db_ms = 0.0
+        self.db_queries = 0
+        self.spans = {}
+
+    def add(self, name, ms):
+        total, count = self.spans.get(name, (0.0, 0))
+        self.spans[name] = (total + ms, count + 1)
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self, total_ms):
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.db_queries} queries"']
+        for name, (ms, count) in self.spans.items():
+            parts.append(f'{name};dur={ms:.1f}' + (f';desc="{count} calls"' if count > 1 else ''))
+        parts.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(parts)
+
+
+def current_profile():
+    return _current.get()
+
+
+class _Span:
+    __slots__ = ('profile', 'name', 'started')
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add(self.name, (time.perf_counter() - self.started) * 1000)
+        return False
+
+
+_NO_SPAN = nullcontext()
+
+
+def span(name):
+    """Time a block under ``name`` when the current request is being profiled."""
+    profile = _current.get()
+    if profile is None:
+        return _NO_SPAN
+    return _Span(profile, name)
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.db_ms += (time.perf_counter() - started) * 1000
+        profile.db_queries += 1
+
+
+_template_hook_lock = threading.Lock()
+_template_hook_installed = False
+
+
+def _install_template_hook():
+    """Time Django template renders under the ``tpl`` span.
+
+    Wraps the backend Template.render used by render() and render_to_string,
+    so includes and inheritance inside one page count once.
+    """
+    global _template_hook_installed
+    with _template_hook_lock:
+        if _template_hook_installed:
+            return
+        from django.template.backends.django import Template
+
+        original = Template.render
+
+        def render(self, context=None, request=None):
+            with span('tpl'):
+                return original(self, context, request)
+
+        Template.render = render
+        _template_hook_installed = True
+
+
+class ProfilingMiddleware:
+    def __init__(self, get_response):
+        config = {**DEFAULTS, **getattr(settings, 'PROFILING', {})}
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.server_timing = bool(config['SERVER_TIMING'])
+        self.sample_rate = float(config['SAMPLE_RATE'])
+        _install_template_hook()
+
+    def __call__(self, request):
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(_db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        total_ms = profile.total_ms()
+        if self.server_timing:
+            response['Server-Timing'] = profile.server_timing(total_ms)
+        if self.sample_rate > 0 and random.random() < self.sample_rate:
+            telemetry.emit(
+                'profiling.request',
+                method=request.method,
+                path=request.path,
+                status=response.status_code,
+                total_ms=round(total_ms, 2),
+                db_ms=round(profile.db_ms, 2),
+                db_queries=profile.db_queries,
+                spans={name: {'ms': round(ms, 2), 'count': count} for name, (ms, count) in profile.spans.items()},
+            )
+        return response
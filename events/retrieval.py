@@ -0,0 +1,292 @@
+"""Event retrieval for chatbot prompts.
+
+Upcoming published events (the soonest ``MAX_DOCUMENTS`` within
+``HORIZON_DAYS``) are indexed in process with BM25 over their title,
+category, short description, highlights and location, with city aliases
+folded to the gazetteer name (events/geo.py). Each entry also keeps its date:
+phrases such as "this weekend" or "in december" become a date filter rather
+than search words. The top ``TOP_K`` matches are summarised in a block for
+the prompt. The block is capped at ``CONTEXT_TOKEN_BUDGET`` estimated
+tokens, so prompt size does not depend on catalogue size.
+
+The index is rebuilt like the "For you" snapshot: when the home cache
+generation changes (at most once per ``MIN_REBUILD_INTERVAL``) or after
+``INDEX_TTL`` seconds.
+
+    retrieval.context_for('any music events in Bangalore this weekend?')
+"""
+import bisect
+import calendar
+import datetime
+import heapq
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.utils import timezone
+
+from . import geo, home_cache
+from .interests import CATEGORY_CHOICES
+from .models import Event
+
+TOP_K = 5
+HORIZON_DAYS = 180
+MAX_DOCUMENTS = 20000
+CONTEXT_TOKEN_BUDGET = 400
+# Rough tokens-per-character ratio for English prose in Gemini's tokenizer.
+CHARS_PER_TOKEN = 4
+SUMMARY_DESCRIPTION_CHARS = 90
+INDEX_TTL = 10 * 60
+MIN_REBUILD_INTERVAL = 60
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+CATEGORY_LABELS = dict(CATEGORY_CHOICES)
+STOPWORDS = frozenset('''
+    a about am an and any anything are at be can could do does event for from get give going have
+    how i in is it just know let like look looking me my near of on or out please recommend show
+    some something suggest tell that the there thing this to up want we what whats when where which
+    who will with would you
+'''.split())
+# Date words used by ``date_window``; they are not scored as text.
+DATE_WORDS = frozenset('today tonight tomorrow weekend week month next upcoming soon'.split())
+WEEKDAYS = {name.lower(): i for i, name in enumerate(calendar.day_name)}
+MONTHS = {name.lower(): i for i, name in enumerate(calendar.month_name) if name}
+MONTHS.update({name.lower(): i for i, name in enumerate(calendar.month_abbr) if name})
+_DATE_TERMS = DATE_WORDS | set(WEEKDAYS) | set(MONTHS)
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def _stem(token):
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def words(text):
+    return _TOKEN_RE.findall((text or '').casefold())
+
+
+def tokenize(text):
+    tokens = (_stem(w) for w in words(text) if len(w) > 1)
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def date_window(text, today):
+    """(first day, last day) named by a date phrase in ``text``, or None."""
+    found = words(text)
+    found_set = set(found)
+    if 'today' in found_set or 'tonight' in found_set:
+        return today, today
+    if 'tomorrow' in found_set:
+        day = today + datetime.timedelta(days=1)
+        return day, day
+    shift = 7 if 'next' in found_set else 0
+    if 'weekend' in found_set:
+        # On a Sunday, "this weekend" is the one that started yesterday.
+        saturday = today + datetime.timedelta(days=(5 - today.weekday()) % 7 if today.weekday() < 6 else -1)
+        saturday += datetime.timedelta(days=shift)
+        return max(saturday, today), saturday + datetime.timedelta(days=1)
+    if 'week' in found_set:
+        monday = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(days=shift)
+        return max(monday, today), monday + datetime.timedelta(days=6)
+    for word in found:
+        if word in WEEKDAYS:
+            day = today + datetime.timedelta(days=(WEEKDAYS[word] - today.weekday()) % 7 + shift)
+            return day, day
+    if 'month' in found_set:
+        year, month = today.year, today.month
+        if shift:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        first = datetime.date(year, month, 1)
+        return max(first, today), datetime.date(year, month, calendar.monthrange(year, month)[1])
+    for i, word in enumerate(found):
+        if word == 'may' and (i == 0 or found[i - 1] not in ('in', 'during')):
+            continue  # "may I book...", not the month.
+        if word in MONTHS:
+            month = MONTHS[word]
+            year = today.year if month >= today.month else today.year + 1
+            first = datetime.date(year, month, 1)
+            return max(first, today), datetime.date(year, month, calendar.monthrange(year, month)[1])
+    return None
+
+
+def _city_terms(text):
+    """Canonical gazetteer city name for any city or alias in ``text``."""
+    found = words(text)
+    places = geo.gazetteer()
+    terms = []
+    for i in range(len(found)):
+        for size in (3, 2, 1):
+            place = places.get(' '.join(found[i:i + size]))
+            if place:
+                terms.extend(tokenize(place[0]))
+                break
+    return terms
+
+
+def _search_terms(text):
+    return [t for t in tokenize(text) if t not in _DATE_TERMS] + _city_terms(text)
+
+
+class Index:
+    def __init__(self, rows, generation, today=None):
+        self.today = today or timezone.localdate()
+        self.generation = generation
+        self.built_at = time.monotonic()
+        self.ids, self.dates, self.lengths = [], [], []
+        self.postings = defaultdict(list)  # term -> [(doc, term frequency)]
+        for pk, title, category, short_description, highlights, location, date in rows:
+            terms = tokenize(title) * 2  # Title words count double.
+            terms += tokenize(CATEGORY_LABELS.get(category, ''))
+            terms += tokenize(short_description) + tokenize(highlights)
+            terms += tokenize(location) + _city_terms(location)
+            doc = len(self.ids)
+            self.ids.append(pk)
+            self.dates.append(date)
+            self.lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings[term].append((doc, tf))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def search(self, text, k=TOP_K, today=None, previous=''):
+        """Ids of the ``k`` best matches, soonest first among equal scores.
+
+        ``previous`` is the user's last question. A follow-up without search
+        words or a date phrase of its own ("what about next weekend?")
+        borrows the missing part from it.
+
+        Returns the soonest events in the date window when there are no
+        searchable words, and nothing when there are words but none match.
+        """
+        today = today or timezone.localdate()
+        window = (
+            date_window(text, today) or (previous and date_window(previous, today))
+            or (today, today + datetime.timedelta(days=HORIZON_DAYS))
+        )
+        terms = _search_terms(text) or _search_terms(previous)
+        first, last = window
+        if not terms:
+            # Entries are in (date, id) order.
+            start = bisect.bisect_left(self.dates, first)
+            return [self.ids[d] for d in range(start, min(start + k, len(self.ids))) if self.dates[d] <= last]
+        scores = defaultdict(float)
+        n = len(self.ids)
+        for term in set(terms):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc, tf in postings:
+                if not first <= self.dates[doc] <= last:
+                    continue
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[doc] / self.average_length)
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1], self.dates[item[0]], self.ids[item[0]]))
+        return [self.ids[doc] for doc, _ in best]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def build_index(generation=None):
+    generation = home_cache.generation() if generation is None else generation
+    today = timezone.localdate()
+    rows = (
+        Event.objects.filter(
+            is_published=True, date__gte=today, date__lte=today + datetime.timedelta(days=HORIZON_DAYS),
+        )
+        .order_by('date', 'pk')
+        .values_list('id', 'title', 'category', 'short_description', 'highlights', 'location', 'date')[:MAX_DOCUMENTS]
+    )
+    return Index(rows.iterator(chunk_size=2000), generation, today)
+
+
+def _fresh(index, generation):
+    age = time.monotonic() - index.built_at
+    if age >= INDEX_TTL or index.today != timezone.localdate():
+        return False
+    return index.generation == generation or age < MIN_REBUILD_INTERVAL
+
+
+def get_index():
+    global _index
+    generation = home_cache.generation()
+    index = _index
+    if index is not None and _fresh(index, generation):
+        return index
+    with _index_lock:
+        index = _index
+        if index is None or not _fresh(index, generation):
+            index = _index = build_index(generation)
+    return index
+
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def summarise(event):
+    parts = [event.title, event.date.strftime('%a %d %b %Y')]
+    if event.time:
+        parts[-1] += event.time.strftime(' %H:%M')
+    parts.append(event.location or 'venue TBA')
+    if event.category:
+        parts.append(CATEGORY_LABELS.get(event.category, event.category))
+    # Coarse seat status only: exact counts would change the prompt, and so
+    # miss the answer cache, on every booking.
+    if event.is_sold_out:
+        parts.append('sold out')
+    elif event.seats_left is not None and event.seats_left <= event.capacity // 10:
+        parts.append('almost full')
+    if event.rating_count:
+        parts.append(f'rated {event.rating_average:.1f}/5')
+    parts.append(f'/events/{event.slug}/')
+    line = '- ' + ' | '.join(parts)
+    description = (event.short_description or '').strip()
+    if description:
+        if len(description) > SUMMARY_DESCRIPTION_CHARS:
+            description = description[:SUMMARY_DESCRIPTION_CHARS - 1].rstrip() + '…'
+        line += f': {description}'
+    return line
+
+
+def matching_events(message, k=TOP_K, previous='', today=None):
+    """The upcoming events best matching ``message``, best first."""
+    ids = get_index().search(message, k, today or timezone.localdate(), previous)
+    events = Event.objects.only(
+        'id', 'title', 'slug', 'short_description', 'category', 'date', 'time', 'location',
+        'capacity', 'seats_taken', 'rating_sum', 'rating_count',
+    ).in_bulk(ids)
+    return [events[pk] for pk in ids if pk in events]
+
+
+def context_for(message, k=TOP_K, budget=CONTEXT_TOKEN_BUDGET, previous=''):
+    """Prompt block listing the events most relevant to ``message``.
+
+    Event lines are added best first until the next one would exceed
+    ``budget`` estimated tokens. ``previous`` is as for ``Index.search``.
+    """
+    today = timezone.localdate()
+    events = matching_events(message, k, previous, today)
+    header = f'Today is {today:%A %d %B %Y}.'
+    if not events:
+        return f'{header}\nNo upcoming events on the site match this question.'
+    lines = [f'{header}\nUpcoming events on the site that may match (title | date | venue | details | link):']
+    used = estimate_tokens(lines[0])
+    for event in events:
+        line = summarise(event)
+        cost = estimate_tokens(line) + 1
+        if used + cost > budget:
+            break
+        lines.append(line)
+        used += cost
+    return '\n'.join(lines)
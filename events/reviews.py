@@ -0,0 +1,97 @@
+"""Event reviews and the rating totals kept on Event.
+
+``Event.rating_sum`` and ``Event.rating_count`` are adjusted with ``F()``
+updates in the same transaction as the review write, so list pages read
+averages straight off the event row and never aggregate the reviews table.
+The "top rated" order is the generated, indexed ``Event.rating_rank`` column.
+Writes must go through ``save`` and ``delete`` here (the admin does);
+``rebuild`` recomputes the totals from the reviews table and ``drift`` lists
+events whose stored totals disagree with it.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from .models import Event, Review
+
+
+def _adjust(event_id, rating_delta, count_delta):
+    Event.objects.filter(pk=event_id).update(
+        rating_sum=F('rating_sum') + rating_delta,
+        rating_count=F('rating_count') + count_delta,
+    )
+
+
+def save(review):
+    """Create or update ``review`` and move its event's totals by the difference.
+
+    When a concurrent submit has already created the user's review for the
+    event (``unique_review``), that review is updated instead and returned.
+    """
+    try:
+        return _save(review)
+    except IntegrityError:
+        existing = None
+        if review.pk is None:
+            existing = Review.objects.filter(user_id=review.user_id, event_id=review.event_id).first()
+        if existing is None:
+            raise
+        existing.rating, existing.comment = review.rating, review.comment
+        return _save(existing)
+
+
+def _save(review):
+    with transaction.atomic():
+        previous = None
+        if review.pk is not None:
+            previous = (
+                Review.objects.select_for_update()
+                .filter(pk=review.pk).values_list('rating', 'event_id').first()
+            )
+        review.save()
+        if previous is None:
+            _adjust(review.event_id, review.rating, 1)
+        elif previous[1] != review.event_id:
+            _adjust(previous[1], -previous[0], -1)
+            _adjust(review.event_id, review.rating, 1)
+        elif previous[0] != review.rating:
+            _adjust(review.event_id, review.rating - previous[0], 0)
+    return review
+
+
+def delete(review):
+    """Delete ``review``. Returns False when it was already gone."""
+    with transaction.atomic():
+        row = Review.objects.select_for_update().filter(pk=review.pk).values_list('rating', 'event_id').first()
+        if row is None:
+            return False
+        Review.objects.filter(pk=review.pk).delete()
+        _adjust(row[1], -row[0], -1)
+    return True
+
+
+def _review_totals():
+    reviews = Review.objects.filter(event=OuterRef('pk')).order_by().values('event')
+    return (
+        Coalesce(Subquery(reviews.annotate(s=Sum('rating')).values('s')), Value(0)),
+        Coalesce(Subquery(reviews.annotate(n=Count('pk')).values('n')), Value(0)),
+    )
+
+
+def rebuild(queryset=None):
+    """Recompute the totals of ``queryset`` (default: all events) from the reviews table."""
+    queryset = Event.objects.all() if queryset is None else queryset
+    rating_sum, rating_count = _review_totals()
+    return queryset.update(rating_sum=rating_sum, rating_count=rating_count)
+
+
+def drift(queryset=None):
+    """Events whose stored totals differ from their reviews, as dicts."""
+    queryset = Event.objects.all() if queryset is None else queryset
+    actual_sum, actual_count = _review_totals()
+    return (
+        queryset.annotate(actual_sum=actual_sum, actual_count=actual_count)
+        .filter(~Q(rating_sum=F('actual_sum')) | ~Q(rating_count=F('actual_count')))
+        .values('pk', 'rating_sum', 'rating_count', 'actual_sum', 'actual_count')
+        .order_by('pk')
+    )
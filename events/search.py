@@ -0,0 +1,158 @@
+"""Full-text search over Event text fields.
+
+SQLite uses an FTS5 virtual table (created by migration 0003) that is kept in
+sync from the Event post_save/post_delete signals. PostgreSQL ranks with
+tsvector/tsquery. Any other backend falls back to icontains filters.
+"""
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'events_event_fts'
+
+# Indexed columns and their bm25 weights, most important first.
+FIELD_WEIGHTS = [
+    ('title', 10.0),
+    ('short_description', 4.0),
+    ('highlights', 3.0),
+    ('location', 3.0),
+    ('description', 1.0),
+]
+FIELDS = [name for name, _ in FIELD_WEIGHTS]
+
+MAX_TERMS = 8
+
+_TERM_RE = re.compile(r'\w+', re.UNICODE)
+
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    + ', '.join(FIELDS)
+    + ", tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+DROP_FTS_SQL = f"DROP TABLE IF EXISTS {FTS_TABLE}"
+
+
+def is_sqlite(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def is_postgres(conn=None):
+    return (conn or connection).vendor == 'postgresql'
+
+
+def parse_terms(q):
+    """Split a raw search string into at most MAX_TERMS lowercase terms."""
+    return [t.lower() for t in _TERM_RE.findall(q or '')][:MAX_TERMS]
+
+
+def _fts_match_expr(terms):
+    # Every term must match, and each one is a prefix query so "conf" finds
+    # "conference". Terms are quoted, which neutralises FTS5 operators.
+    return ' '.join(f'"{t}"*' for t in terms)
+
+
+def _fts_values(event):
+    return [getattr(event, name) or '' for name in FIELDS]
+
+
+def index_event(event):
+    """Insert or replace a single event in the search index."""
+    index_events([event])
+
+
+def index_events(events):
+    """Insert or replace several events, one statement of each kind per call."""
+    if not is_sqlite() or not events:
+        return
+    placeholders = ', '.join(['%s'] * (len(FIELDS) + 1))
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [[event.pk] for event in events])
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FIELDS)}) VALUES ({placeholders})",
+            [[event.pk] + _fts_values(event) for event in events],
+        )
+
+
+def remove_event(event_id):
+    if not is_sqlite():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event_id])
+
+
+def rebuild_index(events=None, chunk_size=1000, conn=None):
+    """Repopulate the index from scratch. Returns the number of rows indexed."""
+    conn = conn or connection
+    if not is_sqlite(conn):
+        return 0
+    if events is None:
+        from .models import Event
+        events = Event.objects.using(conn.alias).only('id', *FIELDS).order_by('pk')
+    placeholders = ', '.join(['%s'] * (len(FIELDS) + 1))
+    insert_sql = f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FIELDS)}) VALUES ({placeholders})"
+    count = 0
+    with conn.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        batch = []
+        for event in events.iterator(chunk_size=chunk_size):
+            batch.append([event.pk] + _fts_values(event))
+            if len(batch) >= chunk_size:
+                cursor.executemany(insert_sql, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+            count += len(batch)
+    return count
+
+
+def _sqlite_search(qs, terms):
+    # The index is joined into the Event query itself, so the caller's
+    # filters (published, date, location) narrow the matches in the same
+    # statement that ranks them. bm25() is lower for better matches.
+    table = qs.model._meta.db_table
+    weights = ', '.join(str(w) for _, w in FIELD_WEIGHTS)
+    return qs.extra(
+        tables=[FTS_TABLE],
+        where=[f'{FTS_TABLE}.rowid = "{table}"."id"', f'{FTS_TABLE} MATCH %s'],
+        params=[_fts_match_expr(terms)],
+    ).annotate(search_rank=RawSQL(f'bm25({FTS_TABLE}, {weights})', [], output_field=FloatField()))
+
+
+def _postgres_search(qs, terms):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    weight_letters = ['A', 'B', 'C', 'C', 'D']
+    vector = None
+    for (name, _), letter in zip(FIELD_WEIGHTS, weight_letters):
+        part = SearchVector(name, weight=letter)
+        vector = part if vector is None else vector + part
+    query = SearchQuery(' & '.join(f'{t}:*' for t in terms), search_type='raw')
+    # Negated so that, as with bm25 on SQLite, lower is better.
+    return qs.annotate(search_rank=-SearchRank(vector, query)).filter(search_rank__lt=0)
+
+
+def search_events(qs, q):
+    """Restrict an Event queryset to matches for ``q``, ordered by relevance.
+
+    When the backend can rank, matches carry a float ``search_rank``
+    annotation (lower = better) that callers can order or paginate on.
+    Every match is returned; callers page through them.
+    """
+    terms = parse_terms(q)
+    if not terms:
+        return qs
+    if is_sqlite():
+        qs = _sqlite_search(qs, terms)
+    elif is_postgres():
+        qs = _postgres_search(qs, terms)
+    else:
+        for term in terms:
+            match = Q()
+            for name in FIELDS:
+                match |= Q(**{f'{name}__icontains': term})
+            qs = qs.filter(match)
+        return qs
+    return qs.order_by('search_rank', 'pk')
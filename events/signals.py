@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import booking, home_cache, search, wishlist
+from .models import Event, Registration, Testimonial, Wishlist
+
+
+@receiver(post_save, sender=Event)
+def index_event_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    search.index_event(instance)
+
+
+@receiver(post_delete, sender=Event)
+def unindex_event_on_delete(sender, instance, **kwargs):
+    search.remove_event(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Event)
+@receiver([post_save, post_delete], sender=Testimonial)
+def invalidate_home_cache(sender, **kwargs):
+    # Bump after commit so a concurrent request cannot re-cache pre-commit data.
+    transaction.on_commit(home_cache.invalidate)
+
+
+@receiver([post_save, post_delete], sender=Wishlist)
+def invalidate_wishlist_ids(sender, instance, **kwargs):
+    user_id = instance.user_id
+    transaction.on_commit(lambda: wishlist.invalidate(user_id))
+
+
+@receiver(post_delete, sender=Registration)
+def release_seat_on_delete(sender, instance, origin=None, **kwargs):
+    # Covers admin deletes and the cascade from a deleted user. When the
+    # event itself is being deleted, its counter goes with it.
+    if instance.cancelled or isinstance(origin, Event) or getattr(origin, 'model', None) is Event:
+        return
+    booking.release_seat(instance.event_id)
@@ -0,0 +1,93 @@
+"""Unique Event slug allocation.
+
+``slugify(title)`` alone collides as soon as two events share a title. The
+allocator hands out ``base``, ``base-2``, ``base-3``... and checks a whole
+batch against the database in one query. It also remembers the suffixes it
+has handed out, so a long import costs about one query per batch rather
+than one per row. Slugs from one ``allocate()`` call must be saved before the
+next call, since only the database is consulted for earlier batches.
+"""
+import re
+from collections import OrderedDict
+
+from django.utils.text import slugify
+
+SLUG_MAX_LENGTH = 220
+# Bases whose next free suffix is remembered between batches. Older entries
+# are dropped, which only costs a re-lookup, so memory stays bounded.
+MAX_REMEMBERED_BASES = 10000
+_SUFFIX_RE = re.compile(r'-(\d+)$')
+
+
+def base_slug(title, max_length=SLUG_MAX_LENGTH):
+    return slugify(title or '')[:max_length].strip('-') or 'event'
+
+
+def with_suffix(base, n, max_length=SLUG_MAX_LENGTH):
+    if n <= 1:
+        return base
+    suffix = f'-{n}'
+    return base[:max_length - len(suffix)].rstrip('-') + suffix
+
+
+class SlugAllocator:
+    def __init__(self, queryset=None, max_length=SLUG_MAX_LENGTH):
+        if queryset is None:
+            from .models import Event
+            queryset = Event.objects.all()
+        self.queryset = queryset
+        self.max_length = max_length
+        self._next = OrderedDict()  # base -> next suffix to try
+
+    def _highest_suffix(self, base):
+        taken = self.queryset.filter(slug__startswith=base).values_list('slug', flat=True)
+        highest = 0
+        for slug in taken.iterator():
+            if slug == base:
+                highest = max(highest, 1)
+                continue
+            match = _SUFFIX_RE.search(slug)
+            if match and with_suffix(base, int(match.group(1)), self.max_length) == slug:
+                highest = max(highest, int(match.group(1)))
+        return highest
+
+    def allocate(self, titles):
+        """Return one unused slug per title, in order."""
+        bases = [base_slug(title, self.max_length) for title in titles]
+        slugs = [None] * len(bases)
+        pending = list(range(len(bases)))
+        issued = set()
+        looked_up = set()
+        while pending:
+            proposals = {}
+            for i in pending:
+                base = bases[i]
+                n = self._next.get(base, 1)
+                candidate = with_suffix(base, n, self.max_length)
+                while candidate in issued or candidate in proposals:
+                    n += 1
+                    candidate = with_suffix(base, n, self.max_length)
+                self._next[base] = n + 1
+                proposals[candidate] = i
+            existing = set(self.queryset.filter(slug__in=list(proposals)).values_list('slug', flat=True))
+            pending = []
+            for candidate, i in proposals.items():
+                if candidate in existing:
+                    pending.append(i)
+                    base = bases[i]
+                    # Jump past everything already stored for this base, once.
+                    if base not in looked_up:
+                        looked_up.add(base)
+                        self._next[base] = max(self._next[base], self._highest_suffix(base) + 1)
+                else:
+                    slugs[i] = candidate
+                    issued.add(candidate)
+        for base in set(bases):
+            self._next.move_to_end(base)
+        while len(self._next) > MAX_REMEMBERED_BASES:
+            self._next.popitem(last=False)
+        return slugs
+
+
+def unique_slug(title):
+    return SlugAllocator().allocate([title])[0]
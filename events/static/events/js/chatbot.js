@@ -57,27 +57,9 @@ class EventsChatbot {
         this.isLoading = true;
 
         try {
-            const response = await fetch('/api/chatbot/', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-CSRFToken': this.getCsrfToken(),
-                },
-                body: JSON.stringify({ message: message })
-            });
-
-            const data = await response.json();
-
-            // Remove typing indicator
-            this.removeTypingIndicator();
-
-            if (data.success) {
-                this.addMessage(data.response, 'bot');
-            } else {
-                this.addMessage(
-                    'Sorry, I encountered an error. Please try again later.',
-                    'bot'
-                );
+            const streamed = await this.streamMessage(message);
+            if (!streamed) {
+                await this.fetchMessage(message);
             }
         } catch (error) {
             console.error('Chatbot error:', error);
@@ -91,6 +73,117 @@ class EventsChatbot {
         }
     }
 
+    // Stream the reply over Server-Sent Events, appending text as it arrives.
+    // Returns false when streaming is unavailable so the caller can fall back.
+    async streamMessage(message) {
+        if (!window.ReadableStream || !window.TextDecoder) {
+            return false;
+        }
+        const response = await fetch('/api/chatbot/stream/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+                'X-CSRFToken': this.getCsrfToken(),
+            },
+            body: JSON.stringify({ message: message })
+        });
+        if (response.status === 429) {
+            // Rate limited: retrying without streaming would be refused too.
+            this.removeTypingIndicator();
+            this.addMessage((await response.json()).error, 'bot');
+            return true;
+        }
+        if (!response.ok || !response.body) {
+            return false;
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let bubble = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
+            }
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+
+            for (const raw of events) {
+                const event = this.parseEvent(raw);
+                if (!event || event.name !== 'message') {
+                    continue;
+                }
+                let delta;
+                try {
+                    delta = JSON.parse(event.data).delta;
+                } catch (error) {
+                    console.warn('Chatbot: skipping malformed stream event', raw);
+                    continue;
+                }
+                if (!bubble) {
+                    this.removeTypingIndicator();
+                    bubble = this.addMessage('', 'bot');
+                }
+                bubble.textContent += delta || '';
+                this.messagesContainer.scrollTop = this.messagesContainer.scrollHeight;
+            }
+        }
+
+        this.removeTypingIndicator();
+        if (!bubble) {
+            this.addMessage('Sorry, I encountered an error. Please try again later.', 'bot');
+        }
+        return true;
+    }
+
+    // Returns null for frames without a data line, such as the ': stream open'
+    // comment the server sends first to flush the headers.
+    parseEvent(raw) {
+        const event = { name: 'message', data: '' };
+        let hasData = false;
+        raw.split('\n').forEach((line) => {
+            if (line.startsWith('event:')) {
+                event.name = line.slice(6).trim();
+            } else if (line.startsWith('data:')) {
+                event.data += line.slice(5).trim();
+                hasData = true;
+            }
+        });
+        return hasData ? event : null;
+    }
+
+    // Plain JSON request/response, used when streaming is not available.
+    async fetchMessage(message) {
+        const response = await fetch('/api/chatbot/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': this.getCsrfToken(),
+            },
+            body: JSON.stringify({ message: message })
+        });
+
+        const data = await response.json();
+
+        // Remove typing indicator
+        this.removeTypingIndicator();
+
+        if (data.success) {
+            this.addMessage(data.response, 'bot');
+        } else if (response.status === 429) {
+            this.addMessage(data.error, 'bot');
+        } else {
+            this.addMessage(
+                'Sorry, I encountered an error. Please try again later.',
+                'bot'
+            );
+        }
+    }
+
     addMessage(text, sender) {
         const messageDiv = document.createElement('div');
         messageDiv.className = `chatbot-message ${sender}-message`;
@@ -103,6 +196,7 @@ class EventsChatbot {
 
         // Scroll to bottom
         this.messagesContainer.scrollTop = this.messagesContainer.scrollHeight;
+        return p;
     }
 
     showTypingIndicator() {
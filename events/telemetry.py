@@ -0,0 +1,228 @@
+"""Structured, non-blocking telemetry.
+
+``emit()`` only does a level check, a sampling check and a ``put_nowait`` on a
+bounded in-memory queue; a daemon thread drains the queue and hands batches
+to the configured sink. When the queue is full, records are dropped and
+counted instead of blocking the request.
+
+Configured through ``settings.TELEMETRY``::
+
+    TELEMETRY = {
+        'ENABLED': True,
+        'LEVEL': 'info',           # debug / info / warning / error
+        'SAMPLE_RATE': 1.0,        # fraction of records kept below WARNING
+        'QUEUE_SIZE': 10000,
+        'BATCH_SIZE': 200,
+        'FLUSH_INTERVAL': 2.0,     # seconds
+        'SINK': 'logging',         # 'logging', 'jsonl', 'null' or a dotted path
+        'PATH': BASE_DIR / 'logs' / 'telemetry.jsonl',  # for the jsonl sink
+    }
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+LEVELS = {
+    'debug': logging.DEBUG,
+    'info': logging.INFO,
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+
+DEFAULTS = {
+    'ENABLED': True,
+    'LEVEL': 'info',
+    'SAMPLE_RATE': 1.0,
+    'QUEUE_SIZE': 10000,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'SINK': 'logging',
+    'PATH': None,
+}
+
+
+class NullSink:
+    def __init__(self, config=None):
+        pass
+
+    def write(self, records):
+        pass
+
+    def close(self):
+        pass
+
+
+class LoggingSink:
+    """Forward each record as one JSON line to the ``events.telemetry`` logger."""
+
+    def __init__(self, config):
+        self.logger = logging.getLogger('events.telemetry')
+
+    def write(self, records):
+        for record in records:
+            self.logger.log(LEVELS.get(record['level'], logging.INFO), json.dumps(record, default=str))
+
+    def close(self):
+        pass
+
+
+class JsonLinesSink:
+    """Append batches to a JSON-lines file, opened once and kept open."""
+
+    def __init__(self, config):
+        path = Path(config.get('PATH') or Path(settings.BASE_DIR) / 'logs' / 'telemetry.jsonl')
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def write(self, records):
+        self._file.write(''.join(json.dumps(r, default=str) + '\n' for r in records))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+SINKS = {
+    'null': NullSink,
+    'logging': LoggingSink,
+    'jsonl': JsonLinesSink,
+}
+
+
+def build_sink(config):
+    sink = config['SINK']
+    if not isinstance(sink, str):
+        return sink
+    if sink in SINKS:
+        return SINKS[sink](config)
+    return import_string(sink)(config)
+
+
+class Telemetry:
+    def __init__(self, config=None, sink=None):
+        config = {**DEFAULTS, **(config or {})}
+        self.enabled = bool(config['ENABLED'])
+        self.level = LEVELS.get(str(config['LEVEL']).lower(), logging.INFO)
+        self.sample_rate = float(config['SAMPLE_RATE'])
+        self.batch_size = int(config['BATCH_SIZE'])
+        self.flush_interval = float(config['FLUSH_INTERVAL'])
+        self.config = config
+        self._queue = queue.Queue(maxsize=int(config['QUEUE_SIZE']))
+        self._sink = sink
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self.dropped = 0
+        self.written = 0
+
+    def enabled_for(self, level):
+        return self.enabled and LEVELS.get(level, logging.INFO) >= self.level
+
+    def emit(self, event, level='info', **data):
+        """Queue one record. Never blocks and never raises."""
+        if not self.enabled_for(level):
+            return
+        # Warnings and errors are always kept; sampling only thins routine records.
+        if self.sample_rate < 1.0 and LEVELS.get(level, logging.INFO) < logging.WARNING:
+            if random.random() >= self.sample_rate:
+                return
+        self._ensure_worker()
+        record = {'ts': time.time(), 'level': level, 'event': event, 'data': data}
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def _ensure_worker(self):
+        # Restart after fork: the parent's thread does not exist in the child.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='telemetry-flusher', daemon=True)
+            self._thread.start()
+
+    def _drain(self):
+        batch = []
+        try:
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        if self._sink is None:
+            self._sink = build_sink(self.config)
+        try:
+            self._sink.write(batch)
+            self.written += len(batch)
+        except Exception:
+            self.dropped += len(batch)
+
+    def _run(self):
+        # Flush every FLUSH_INTERVAL, or sooner once a full batch is waiting.
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Synchronously write everything queued so far (used at exit and in tests)."""
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    break
+                self._write(batch)
+
+    def stats(self):
+        return {'queued': self._queue.qsize(), 'written': self.written, 'dropped': self.dropped}
+
+
+_telemetry = None
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry():
+    global _telemetry
+    if _telemetry is None:
+        with _telemetry_lock:
+            if _telemetry is None:
+                _telemetry = Telemetry(getattr(settings, 'TELEMETRY', None))
+                atexit.register(_telemetry.flush)
+    return _telemetry
+
+
+def emit(event, level='info', **data):
+    get_telemetry().emit(event, level, **data)
+
+
+@receiver(setting_changed)
+def reset_on_settings_change(setting, **kwargs):
+    # Lets override_settings(TELEMETRY=...) take effect; records already
+    # queued are still written by the old instance's worker.
+    global _telemetry
+    if setting == 'TELEMETRY':
+        with _telemetry_lock:
+            _telemetry = None
@@ -0,0 +1,528 @@
+import datetime
+import json
+import re
+import threading
+import time
+import warnings
+from types import SimpleNamespace
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from events import booking, chatbot, chatbot_cache, geo, reviews, throttle, views
+from events.models import Event, Profile, Registration, Review, Testimonial
+
+# Keep test runs out of the developer's logs/telemetry.jsonl.
+_telemetry_settings = override_settings(TELEMETRY={**settings.TELEMETRY, 'SINK': 'null'})
+
+
+def setUpModule():
+    _telemetry_settings.enable()
+
+
+def tearDownModule():
+    _telemetry_settings.disable()
+
+
+class ConcurrentBookingTests(TransactionTestCase):
+    """Many users book the last seats of an event at the same moment.
+
+    SQLite lets one writer in at a time, so there the threads mostly check the
+    counter bookkeeping; on PostgreSQL they race on the event row for real.
+    """
+
+    users = 30
+    capacity = 7
+
+    def setUp(self):
+        self.event = Event.objects.create(
+            title='Stress test', date=datetime.date.today() + datetime.timedelta(days=30), capacity=self.capacity,
+        )
+        self.user_ids = [User.objects.create_user(f'stress{i}').pk for i in range(self.users)]
+
+    def book_concurrently(self, user_ids):
+        start = threading.Barrier(len(user_ids))
+        outcomes = {}
+
+        def book(user_id):
+            try:
+                start.wait()
+                while True:
+                    try:
+                        booking.register(Registration(user_id=user_id, event_id=self.event.pk))
+                        outcomes[user_id] = 'booked'
+                    except booking.SoldOut:
+                        outcomes[user_id] = 'sold out'
+                    except OperationalError as e:
+                        # SQLite lets one writer in at a time; the others retry.
+                        if 'locked' not in str(e):
+                            raise
+                        time.sleep(0.001)
+                        continue
+                    break
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=book, args=(user_id,)) for user_id in user_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def assertSeatsMatch(self, expected):
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.seats_taken, expected)
+        self.assertEqual(Registration.objects.filter(event=self.event, cancelled=False).count(), expected)
+        self.assertFalse(booking.drift().exists())
+
+    def test_no_oversell(self):
+        outcomes = self.book_concurrently(self.user_ids)
+        self.assertEqual(len(outcomes), self.users)
+        self.assertEqual(list(outcomes.values()).count('booked'), self.capacity)
+        self.assertSeatsMatch(self.capacity)
+
+    def test_released_seats_are_rebooked_once(self):
+        self.book_concurrently(self.user_ids)
+        booked = Registration.objects.filter(event=self.event, cancelled=False)
+        booking.cancel(booked[0])
+        booked[1].delete()
+        User.objects.filter(pk=booked[2].user_id).delete()
+        self.assertSeatsMatch(self.capacity - 3)
+
+        waiting = list(Registration.objects.values_list('user_id', flat=True).filter(cancelled=False))
+        waiting = [user_id for user_id in User.objects.values_list('pk', flat=True) if user_id not in waiting]
+        outcomes = self.book_concurrently(waiting)
+        self.assertEqual(list(outcomes.values()).count('booked'), 3)
+        self.assertSeatsMatch(self.capacity)
+
+
+class FakeGenAI:
+    """Stands in for the genai module: counts list_models() calls, which are slow."""
+
+    def __init__(self):
+        self.list_calls = 0
+        self._lock = threading.Lock()
+
+    def list_models(self):
+        with self._lock:
+            self.list_calls += 1
+        time.sleep(0.05)
+        return [SimpleNamespace(name='models/fake-model', supported_generation_methods=['generateContent'])]
+
+    def GenerativeModel(self, name):
+        return FakeModel(name)
+
+
+class FakeModel:
+    def __init__(self, name, latency=0):
+        self.name = name
+        self.latency = latency
+        self.request_options = None
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        with self._lock:
+            self.calls += 1
+        self.request_options = request_options
+        time.sleep(self.latency)
+        chunks = [SimpleNamespace(text=word) for word in ('Browse ', 'the ', 'events ', 'page.')]
+        return iter(chunks) if stream else SimpleNamespace(text=''.join(chunk.text for chunk in chunks))
+
+
+class ModelRegistryTests(SimpleTestCase):
+    def test_models_are_listed_once(self):
+        client = FakeGenAI()
+        registry = chatbot.ModelRegistry(client=client)
+        start = threading.Barrier(20)
+        models = []
+
+        def request():
+            start.wait()
+            models.append(registry.get())
+
+        threads = [threading.Thread(target=request) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        models.append(registry.get())
+
+        self.assertEqual(client.list_calls, 1)
+        self.assertEqual({id(model) for model in models}, {id(models[0])})
+        self.assertEqual(models[0].name, 'fake-model')
+
+    def test_models_are_listed_again_after_repeated_failures(self):
+        client = FakeGenAI()
+        registry = chatbot.ModelRegistry(max_failures=2, client=client)
+        registry.get()
+        registry.report_failure()
+        registry.get()
+        self.assertEqual(client.list_calls, 1)
+        registry.report_failure()
+        registry.get()
+        self.assertEqual(client.list_calls, 2)
+
+
+class HomeCacheTests(TestCase):
+    """The cached anonymous home page changes as soon as its content does."""
+
+    def setUp(self):
+        cache.clear()
+        self.event = Event.objects.create(title='Jazz Night', date=datetime.date.today() + datetime.timedelta(days=7))
+
+    def home(self):
+        response = self.client.get(reverse('events:index'))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def change(self, write):
+        # Invalidation runs on commit, which TestCase never reaches on its own.
+        with self.captureOnCommitCallbacks(execute=True):
+            write()
+
+    def test_event_changes_show_up(self):
+        self.assertIn('Jazz Night', self.home())
+        self.assertIn('Jazz Night', self.home())
+
+        self.event.title = 'Blues Night'
+        self.change(self.event.save)
+        self.assertIn('Blues Night', self.home())
+
+        self.change(lambda: Event.objects.create(title='Salsa Social', date=datetime.date.today()))
+        self.assertIn('Salsa Social', self.home())
+
+        self.change(self.event.delete)
+        page = self.home()
+        self.assertNotIn('Blues Night', page)
+        self.assertIn('Salsa Social', page)
+
+    def test_testimonial_changes_show_up(self):
+        self.assertNotIn('Best weekend ever', self.home())
+
+        testimonial = Testimonial(text='Best weekend ever')
+        self.change(testimonial.save)
+        self.assertIn('Best weekend ever', self.home())
+
+        testimonial.text = 'Best month ever'
+        self.change(testimonial.save)
+        self.assertIn('Best month ever', self.home())
+
+        self.change(testimonial.delete)
+        self.assertNotIn('Best month ever', self.home())
+
+
+class AudienceCountTests(TestCase):
+    def setUp(self):
+        organiser = User.objects.create_user('organiser')
+        Profile.objects.create(user=organiser, is_organiser=True, city='Pune', interests='music')
+        Profile.objects.create(user=User.objects.create_user('fan'), city='Pune', interests='tech,music')
+        self.client.force_login(organiser)
+
+    def count(self, **params):
+        return self.client.get(reverse('events:audience_count'), params)
+
+    def test_categories_match_in_any_case(self):
+        self.assertEqual(self.count(any='Tech').json()['count'], 1)
+        self.assertEqual(self.count(all='MUSIC').json()['count'], 2)
+
+    def test_unknown_category_is_rejected(self):
+        for params in ({'any': 'tehc'}, {'all': 'music,tehc'}):
+            response = self.count(**params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('tehc', response.json()['error'])
+
+
+class GeocodingTests(TestCase):
+    def test_edited_location_is_geocoded_again(self):
+        event = Event.objects.create(title='Meetup', date=datetime.date.today(), location='Pune')
+        pune = (event.latitude, event.longitude, event.geohash)
+        self.assertIsNotNone(pune[0])
+
+        event = Event.objects.get(pk=event.pk)
+        event.location = 'Mumbai'
+        event.save()
+        event.refresh_from_db()
+        self.assertNotEqual((event.latitude, event.longitude, event.geohash), pune)
+        self.assertEqual(event.geohash, geo.encode(event.latitude, event.longitude))
+
+        event.location = 'Somewhere unknown'
+        event.save()
+        self.assertEqual((event.latitude, event.longitude, event.geohash), (None, None, ''))
+
+    def test_coordinates_edited_with_the_location_are_kept(self):
+        event = Event.objects.create(title='Meetup', date=datetime.date.today(), location='Pune')
+        event.location = 'Basecamp'
+        event.latitude, event.longitude = 27.99, 86.93
+        event.save()
+        event.refresh_from_db()
+        self.assertEqual((event.latitude, event.longitude), (27.99, 86.93))
+
+
+class ReviewTests(TestCase):
+    def test_second_review_by_the_same_user_edits_the_first(self):
+        user = User.objects.create_user('critic')
+        event = Event.objects.create(title='Gig', date=datetime.date.today())
+        first = reviews.save(Review(user=user, event=event, rating=5))
+        # As a double submit would: both requests found no review to edit.
+        second = reviews.save(Review(user=user, event=event, rating=2, comment='Too loud'))
+
+        self.assertEqual(second.pk, first.pk)
+        self.assertEqual(list(Review.objects.values_list('rating', 'comment')), [(2, 'Too loud')])
+        event.refresh_from_db()
+        self.assertEqual((event.rating_sum, event.rating_count), (2, 1))
+        self.assertFalse(reviews.drift().exists())
+
+
+@mock.patch.object(chatbot, 'GEMINI_API_KEY', 'test')
+@mock.patch.object(chatbot, 'retrieve_context', lambda message, previous='': '')
+class CircuitBreakerTrialTests(SimpleTestCase):
+    def setUp(self):
+        self.breaker = chatbot.CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        self.breaker.record_failure()
+        self.registry = chatbot.ModelRegistry(client=FakeGenAI())
+        self.cache = chatbot.ResponseCache(chatbot.SYSTEM_PROMPT)
+        self.cache.cache.clear()
+
+    def chatbot(self):
+        return chatbot.EventsChatbot(
+            registry=self.registry, cache=self.cache,
+            breaker=self.breaker, deadline=5,
+        )
+
+    def test_abandoned_trial_stream_lets_the_next_trial_through(self):
+        stream = self.chatbot().stream_response('How do I book?')
+        self.assertEqual(next(stream), 'Browse ')
+        self.assertEqual(self.breaker.state, chatbot.CircuitBreaker.HALF_OPEN)
+        # What the server does when the client disconnects.
+        stream.close()
+
+        self.assertEqual(''.join(self.chatbot().stream_response('How do I book?')), 'Browse the events page.')
+        self.assertEqual(self.breaker.state, chatbot.CircuitBreaker.CLOSED)
+
+    def test_calls_are_bounded_by_the_deadline(self):
+        self.assertEqual(self.chatbot().get_response('How do I book?'), 'Browse the events page.')
+        self.assertEqual(self.registry.get().request_options, {'timeout': 5, 'retry': None})
+
+
+class FakeStreamingChatbot:
+    """Stands in for EventsChatbot in the streaming view."""
+
+    def __init__(self, conversation=None):
+        self.conversation = conversation
+
+    def stream_response(self, user_message):
+        yield 'To register, '
+        yield 'open the event page.'
+
+
+@mock.patch.object(views, 'EventsChatbot', FakeStreamingChatbot)
+class ChatbotStreamTests(TestCase):
+    expected = (
+        ': stream open\n\n'
+        'event: message\ndata: {"delta": "To register, "}\n\n'
+        'event: message\ndata: {"delta": "open the event page."}\n\n'
+        'event: done\ndata: {}\n\n'
+    )
+
+    def post(self, client):
+        return client.post(
+            reverse('events:chatbot_stream'), json.dumps({'message': 'How do I register?'}),
+            content_type='application/json',
+        )
+
+    def test_frames_under_wsgi(self):
+        response = self.post(self.client)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        # Django warns, and buffers the whole reply, when the iterator does
+        # not suit the server.
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            self.assertEqual(b''.join(response.streaming_content).decode(), self.expected)
+
+    async def test_frames_under_asgi(self):
+        response = await self.post(self.async_client)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            body = b''.join([part async for part in response])
+        self.assertEqual(body.decode(), self.expected)
+
+
+_SQLITE_SCAN = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+_POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+            return [row[-1] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN ' + sql)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def full_scans(plan):
+    """Tables the plan reads in full; virtual tables such as the FTS index are not in table_names()."""
+    pattern = _SQLITE_SCAN if connection.vendor == 'sqlite' else _POSTGRES_SCAN
+    tables = set(connection.introspection.table_names())
+    matches = (pattern.search(line.strip()) for line in plan)
+    return [match.group(1) for match in matches if match and match.group(1) in tables]
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+    'chatbot': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+})
+class QueryPlanTests(TestCase):
+    """The queries behind the hot views use an index, never a full table scan.
+
+    Every SELECT a hot route runs is EXPLAINed. Caches are dummies, so each
+    request reaches the database.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.organiser = User.objects.create_user('plancheck-organiser', 'organiser@example.com')
+        Profile.objects.create(user=cls.organiser, is_organiser=True)
+        cls.attendee = User.objects.create_user('plancheck-attendee', 'attendee@example.com')
+        today = datetime.date.today()
+        # More than one event_list page, so the keyset queries run too.
+        cls.events = [
+            Event.objects.create(
+                title=f'Plan check event {i}', slug=f'plan-check-event-{i}', organiser=cls.organiser,
+                date=today + datetime.timedelta(days=i), location='Pune', capacity=100,
+                short_description='Music and tech meetup',
+            )
+            for i in range(views.EVENTS_PER_PAGE + 6)
+        ]
+        Registration.objects.create(user=cls.attendee, event=cls.events[0], full_name='Plan Check')
+        Testimonial.objects.create(user=cls.attendee, text='Great')
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Tiny fixture tables make a seq scan look cheapest; ask whether
+            # an index plan exists at all.
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+        elif connection.vendor != 'sqlite':
+            self.skipTest(f'Query plan checks are not implemented for {connection.vendor}.')
+
+    def assertIndexed(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertLess(response.status_code, 400)
+        selects = [q['sql'] for q in queries.captured_queries if q['sql'].lstrip().upper().startswith('SELECT')]
+        scans = []
+        for sql in selects:
+            plan = explain(sql)
+            if full_scans(plan):
+                scans.append(f'{sql}\n  {plan}')
+        self.assertFalse(scans, 'Full table scans:\n' + '\n'.join(scans))
+        return response
+
+    def test_index(self):
+        self.assertIndexed(reverse('events:index'))
+
+    def test_event_list(self):
+        page = self.assertIndexed(reverse('events:event_list')).context['page']
+        self.assertTrue(page.next_cursor)
+        self.assertIndexed(reverse('events:event_list'), {'after': page.next_cursor})
+
+    def test_event_list_filters(self):
+        url = reverse('events:event_list')
+        self.assertIndexed(url, {'q': 'music'})
+        self.assertIndexed(url, {'date': self.events[3].date.isoformat()})
+        self.assertIndexed(url, {'near': 'Pune', 'radius': 10})
+
+    def test_event_list_top_rated(self):
+        for event in self.events[:3]:
+            reviews.save(Review(user=self.attendee, event=event, rating=4))
+        page = self.assertIndexed(reverse('events:event_list'), {'sort': 'rating'}).context['page']
+        self.assertTrue(page.next_cursor)
+        self.assertIndexed(reverse('events:event_list'), {'sort': 'rating', 'after': page.next_cursor})
+
+    def test_attendee_pages(self):
+        self.client.force_login(self.attendee)
+        self.assertIndexed(reverse('events:profile'))
+        self.assertIndexed(reverse('events:register_event', args=[self.events[1].slug]))
+        self.assertIndexed(reverse('events:event_detail', args=[self.events[0].slug]))
+
+    def test_organiser_pages(self):
+        self.client.force_login(self.organiser)
+        self.assertIndexed(reverse('events:organiser_dashboard'))
+        self.assertIndexed(reverse('events:organiser_event_registrations', args=[self.events[0].slug]))
+
+
+@mock.patch.object(chatbot, 'GEMINI_API_KEY', 'test')
+@mock.patch.object(chatbot, 'retrieve_context', lambda message, previous='': '')
+class CoalescingTests(SimpleTestCase):
+    def test_identical_opening_questions_make_one_model_call(self):
+        registry = chatbot.ModelRegistry(client=FakeGenAI())
+        model = registry.get()
+        model.latency = 0.2
+        response_cache = chatbot.ResponseCache(chatbot.SYSTEM_PROMPT)
+        response_cache.cache.clear()
+        flights = chatbot_cache.SingleFlight()
+        start = threading.Barrier(20)
+        answers = []
+
+        def visitor():
+            bot = chatbot.EventsChatbot(
+                registry=registry, cache=response_cache, flights=flights,
+                breaker=chatbot.CircuitBreaker(), deadline=5,
+            )
+            start.wait()
+            answers.append(bot.get_response('How do I book an event?'))
+
+        threads = [threading.Thread(target=visitor) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(model.calls, 1)
+        self.assertEqual(answers, ['Browse the events page.'] * 20)
+        self.assertEqual(flights.in_flight(), 0)
+
+
+class ThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_bucket_refuses_after_its_burst_and_refills(self):
+        limits = {'bucket': (3, 1.0)}
+        self.assertEqual([throttle.take(limits, now=100) for _ in range(3)], [0, 0, 0])
+        self.assertAlmostEqual(throttle.take(limits, now=100), 1.0)
+        self.assertAlmostEqual(throttle.take(limits, now=100.5), 0.5)
+        self.assertEqual(throttle.take(limits, now=101), 0)
+        self.assertGreater(throttle.take(limits, now=101), 0)
+
+    def test_refused_request_takes_no_token(self):
+        throttle.take({'empty': (1, 0.1)}, now=100)
+        self.assertGreater(throttle.take({'full': (5, 1.0), 'empty': (1, 0.1)}, now=100), 0)
+        # The full bucket lost nothing to the refused request.
+        self.assertEqual([throttle.take({'full': (5, 1.0)}, now=100) for _ in range(5)], [0] * 5)
+
+    @override_settings(
+        CHATBOT_RATE_LIMIT={**settings.CHATBOT_RATE_LIMIT, 'BURST': 2, 'IP_BURST': 100},
+        SESSION_ENGINE='django.contrib.sessions.backends.cache',
+    )
+    @mock.patch.object(views, 'EventsChatbot')
+    def test_chatbot_api_answers_429_with_retry_after(self, fake_chatbot):
+        fake_chatbot.return_value.get_response.return_value = 'Hello!'
+        url = reverse('events:chatbot_response')
+        body = json.dumps({'message': 'Hi'})
+        # The first message creates the session, so only the IP bucket sees it.
+        statuses = [self.client.post(url, body, content_type='application/json').status_code for _ in range(3)]
+        refused = self.client.post(url, body, content_type='application/json')
+        self.assertEqual(statuses, [200, 200, 200])
+        self.assertEqual(refused.status_code, 429)
+        self.assertGreaterEqual(int(refused['Retry-After']), 1)
@@ -0,0 +1,71 @@
+"""Token-bucket rate limiting backed by the Django cache.
+
+A bucket holds up to ``burst`` tokens and refills at a steady rate. Each
+request takes one token, or is refused with the number of seconds until a
+token is available again. A bucket's state is a ``(tokens, timestamp)`` pair
+in the cache, so every worker that shares the cache shares the limit, and
+idle buckets simply expire.
+
+The read-modify-write is locked within a process only. With a cache shared
+between processes, two workers racing on one bucket can let a request or two
+through over the limit, which is fine for abuse protection.
+
+The chatbot API (see ``settings.CHATBOT_RATE_LIMIT``) keeps one bucket per
+session and a looser one per client IP. The IP bucket also covers clients
+that drop their session cookie to get a fresh bucket.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+_lock = threading.Lock()
+
+
+def take(limits, cache_alias='default', now=None):
+    """Take one token from every bucket in ``limits``, or from none of them.
+
+    ``limits`` maps cache keys to ``(burst, tokens per second)``. Returns 0
+    when the request is allowed, else the seconds until every bucket has a
+    token again.
+    """
+    now = time.time() if now is None else now
+    cache = caches[cache_alias]
+    with _lock:
+        stored = cache.get_many(list(limits))
+        levels, wait = {}, 0.0
+        for key, (burst, rate) in limits.items():
+            tokens, updated = stored.get(key, (burst, now))
+            tokens = min(burst, tokens + max(now - updated, 0) * rate)
+            levels[key] = tokens
+            if tokens < 1:
+                wait = max(wait, (1 - tokens) / rate)
+        if wait:
+            return wait
+        # A bucket left alone this long is full again, so it need not be kept.
+        timeout = max(burst / rate for burst, rate in limits.values()) + 1
+        cache.set_many({key: (tokens - 1, now) for key, tokens in levels.items()}, timeout)
+    return 0.0
+
+
+def client_ip(request):
+    # Behind a proxy, configure it to set REMOTE_ADDR; X-Forwarded-For is
+    # supplied by the client and cannot be trusted here.
+    return request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+def chatbot_retry_after(request):
+    """Seconds the client must wait before its next chatbot message; 0 if it may send now."""
+    config = settings.CHATBOT_RATE_LIMIT
+    if not config['ENABLED']:
+        return 0.0
+    limits = {
+        f'ratelimit:chatbot:ip:{client_ip(request)}': (config['IP_BURST'], config['IP_PER_MINUTE'] / 60),
+    }
+    # A visitor's first message arrives before its session exists, so only
+    # the IP bucket counts it.
+    session_key = request.session.session_key
+    if session_key:
+        limits[f'ratelimit:chatbot:session:{session_key}'] = (config['BURST'], config['PER_MINUTE'] / 60)
+    return take(limits, config['CACHE_ALIAS'])
@@ -6,18 +6,29 @@ app_name = 'events'
 urlpatterns = [
     path('', views.index, name='index'),
     path('events/', views.event_list, name='event_list'),
+    path('for-you/', views.for_you, name='for_you'),
     path('events/<slug:slug>/', views.event_detail, name='event_detail'),
     path('events/<slug:slug>/register/', views.register_event, name='register_event'),
+    path('events/<slug:slug>/wishlist/', views.toggle_wishlist, name='toggle_wishlist'),
+    path('events/<slug:slug>/reviews/', views.submit_review, name='submit_review'),
+    path('reviews/<int:pk>/delete/', views.delete_review, name='delete_review'),
     path('signup/', views.signup_view, name='signup'),
     path('login/', views.login_view, name='login'),
     path('logout/', views.logout_view, name='logout'),
     path('profile/', views.profile_view, name='profile'),
+    path('registrations/<int:pk>/cancel/', views.cancel_registration, name='cancel_registration'),
     path('gallery/', views.gallery_view, name='gallery'),
     path('community/', views.community_view, name='community'),
     path('support/', views.support_view, name='support'),
     path('privacy/', views.privacy_view, name='privacy'),
     path('terms/', views.terms_view, name='terms'),
     path('organiser/', views.organiser_dashboard, name='organiser_dashboard'),
+    path('organiser/events/<slug:slug>/registrations/', views.organiser_event_registrations, name='organiser_event_registrations'),
+    path('organiser/events/<slug:slug>/registrations/export/', views.export_event_registrations, name='export_event_registrations'),
+    path('organiser/registrations/export/', views.export_all_registrations, name='export_all_registrations'),
+    path('organiser/events/import/', views.import_events, name='import_events'),
+    path('organiser/audience/', views.audience_count, name='audience_count'),
     path('create-event/', views.create_event, name='create_event'),
     path('api/chatbot/', views.chatbot_response, name='chatbot_response'),
+    path('api/chatbot/stream/', views.chatbot_stream, name='chatbot_stream'),
 ]
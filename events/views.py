@@ -1,37 +1,144 @@
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Event, Registration, Profile, Testimonial
-from .forms import RegistrationForm, SignupForm, EventForm, ProfileForm
+from django.core.paginator import Paginator
+from django.db.models import Count, Prefetch
+from .models import Event, Registration, Profile, Review
+from .forms import RegistrationForm, SignupForm, EventForm, ProfileForm, ReviewForm
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
-from django.core.mail import send_mail
 from django.contrib.auth.models import User
-from django.http import JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+import datetime
 import json
+import math
+from urllib.parse import urlencode
+from asgiref.sync import sync_to_async
+from . import audience, booking, exporter, feed, geo, home_cache, importer, outbox, reviews, search, telemetry, throttle, wishlist
 from .chatbot import EventsChatbot
+from .chatbot_memory import Conversation
+from .pagination import keyset_paginate
+
+# Public event list: page size, and the only Event columns the cards render.
+EVENTS_PER_PAGE = 24
+EVENT_CARD_FIELDS = (
+    'id', 'title', 'slug', 'short_description', 'image_url', 'date', 'location', 'rating_sum', 'rating_count',
+)
+
+# Event page: how many of the newest reviews are listed.
+EVENT_REVIEWS_SHOWN = 10
+
+# "For you" feed: cards on the home page and on the full feed page.
+HOME_FEED_SIZE = 4
+FEED_PAGE_SIZE = 24
+
+# Organiser dashboard sizing: events per page, and how many recent registrations
+# are previewed per event before linking to the full paginated list.
+DASHBOARD_EVENTS_PER_PAGE = 10
+DASHBOARD_REGISTRATIONS_PREVIEW = 5
+REGISTRATIONS_PER_PAGE = 50
 
 
 def index(request):
-    events = Event.objects.filter(is_published=True).order_by('date')[:8]
-    testimonials = Testimonial.objects.order_by('-created_at')[:3]
-    latest = Event.objects.filter(is_published=True).order_by('-created_at')[:6]
-    return render(request, 'events/index.html', {'events': events, 'testimonials': testimonials, 'latest': latest})
+    gen = home_cache.generation()
+    # Anonymous visitors all see the same page unless a flash message is pending.
+    cacheable = not request.user.is_authenticated and not len(messages.get_messages(request))
+    if cacheable:
+        page = home_cache.get_page(gen)
+        if page is not None:
+            return HttpResponse(page)
+    context = {
+        **home_cache.get_payload(gen),
+        'home_generation': gen,
+        'home_cache_timeout': home_cache.HOME_CACHE_TIMEOUT,
+    }
+    if request.user.is_authenticated:
+        context['for_you'] = feed.for_user(request.user, HOME_FEED_SIZE, EVENT_CARD_FIELDS)
+        saved = context['saved_ids'] = wishlist.saved_ids(request)
+        # The featured fragment shows saved badges, so it varies on which
+        # featured events are saved; users with none share the anonymous copy.
+        context['saved_featured'] = ','.join(str(e.pk) for e in context['events'][:4] if e.pk in saved)
+    response = render(request, 'events/index.html', context)
+    if cacheable:
+        home_cache.set_page(gen, response.content)
+    return response
 
 
 def event_list(request):
-    qs = Event.objects.filter(is_published=True).order_by('date')
+    qs = Event.objects.filter(is_published=True).only(*EVENT_CARD_FIELDS)
     q = request.GET.get('q')
     date = request.GET.get('date')
     location = request.GET.get('location')
-    if q:
-        qs = qs.filter(title__icontains=q)
     if date:
         qs = qs.filter(date=date)
     if location:
         qs = qs.filter(location__icontains=location)
-    return render(request, 'events/event_list.html', {'events': qs})
+    key, parse = 'date', datetime.date.fromisoformat
+    if q:
+        qs = search.search_events(qs, q)
+        if 'search_rank' in qs.query.annotations:
+            key, parse = 'search_rank', float
+    if request.GET.get('sort') == 'rating':
+        qs = qs.only(*EVENT_CARD_FIELDS, 'rating_rank')
+        key, parse = 'rating_rank', float
+    near, geo_error = request.GET.get('near'), None
+    origin = _search_origin(request.GET)
+    if origin is None and (near or request.GET.get('lat')):
+        geo_error = f'Unknown place "{near}".' if near else 'Invalid coordinates.'
+    if origin is not None:
+        # Distance order takes over from date or search rank.
+        page = geo.paginate(
+            qs, *origin, _search_radius(request.GET.get('radius')), EVENTS_PER_PAGE,
+            after=request.GET.get('after'), before=request.GET.get('before'),
+        )
+    else:
+        page = keyset_paginate(
+            qs, key, EVENTS_PER_PAGE,
+            after=request.GET.get('after'), before=request.GET.get('before'), parse=parse,
+        )
+    params = ('q', 'date', 'location', 'sort', 'near', 'lat', 'lon', 'radius')
+    filters = urlencode({k: request.GET[k] for k in params if request.GET.get(k)})
+    return render(request, 'events/event_list.html', {
+        'events': page,
+        'page': page,
+        'filters': filters,
+        'geo_error': geo_error,
+        'default_radius': geo.DEFAULT_RADIUS_KM,
+        'saved_ids': wishlist.saved_ids(request),
+    })
+
+
+def _search_origin(params):
+    """(latitude, longitude) from ``near=<city>`` or ``lat``/``lon``, or None."""
+    if params.get('near'):
+        place = geo.locate(params['near'])
+        return place[1:] if place else None
+    try:
+        lat, lon = float(params['lat']), float(params['lon'])
+    except (KeyError, ValueError):
+        return None
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None
+    return lat, lon
+
+
+def _search_radius(value):
+    try:
+        radius = float(value)
+    except (TypeError, ValueError):
+        return geo.DEFAULT_RADIUS_KM
+    if not radius > 0:
+        return geo.DEFAULT_RADIUS_KM
+    return min(radius, geo.MAX_RADIUS_KM)
+
+
+@login_required
+def for_you(request):
+    events = feed.for_user(request.user, FEED_PAGE_SIZE, EVENT_CARD_FIELDS)
+    return render(request, 'events/for_you.html', {'events': events, 'saved_ids': wishlist.saved_ids(request)})
 
 
 def event_detail(request, slug):
@@ -47,26 +154,70 @@ def event_detail(request, slug):
             recipient = [event.organiser.email]
         else:
             recipient = [request.site_settings.EMAIL_HOST_USER] if hasattr(request, 'site_settings') else [request.user.email if request.user.is_authenticated else 'no-reply@example.com']
-        send_mail(
+        outbox.queue_mail(
             f'Contact about {event.title}',
             full_message,
             'no-reply@example.com',
             recipient,
-            fail_silently=True,
         )
         messages.success(request, 'Message sent to the organiser (console in dev).')
         return redirect('events:event_detail', slug=slug)
 
-    return render(request, 'events/event_detail.html', {'event': event})
+    context = {
+        'event': event,
+        'saved_ids': wishlist.saved_ids(request),
+        'reviews': event.review_set.select_related('user').order_by('-created_at', '-pk')[:EVENT_REVIEWS_SHOWN],
+    }
+    if request.user.is_authenticated:
+        own = event.review_set.filter(user=request.user).order_by('pk').first()
+        context['own_review'] = own
+        context['can_review'] = own is not None or _attended(request.user, event)
+        if context['can_review']:
+            context['review_form'] = ReviewForm(instance=own)
+    return render(request, 'events/event_detail.html', context)
+
+
+def _attended(user, event):
+    return Registration.objects.filter(user=user, event=event, cancelled=False).exists()
+
+
+@login_required
+@require_http_methods(["POST"])
+def submit_review(request, slug):
+    event = get_object_or_404(Event.objects.only('id', 'slug'), slug=slug)
+    # One review per user and event; posting again edits it.
+    review = event.review_set.filter(user=request.user).order_by('pk').first()
+    if review is None and not _attended(request.user, event):
+        messages.error(request, 'Only registered attendees can review this event.')
+        return redirect('events:event_detail', slug=slug)
+    form = ReviewForm(request.POST, instance=review or Review(user=request.user, event=event))
+    if form.is_valid():
+        reviews.save(form.instance)
+        messages.success(request, 'Thanks, your review was saved.')
+    else:
+        messages.error(request, 'Please pick a rating from 1 to 5 stars.')
+    return redirect('events:event_detail', slug=slug)
+
+
+@login_required
+@require_http_methods(["POST"])
+def delete_review(request, pk):
+    review = get_object_or_404(Review.objects.select_related('event'), pk=pk, user=request.user)
+    if reviews.delete(review):
+        messages.success(request, 'Your review was deleted.')
+    return redirect('events:event_detail', slug=review.event.slug)
 
 
 @login_required
 def register_event(request, slug):
     event = get_object_or_404(Event, slug=slug)
-    existing = Registration.objects.filter(user=request.user, event=event, cancelled=False).first()
+    existing = Registration.objects.filter(user=request.user, event=event, cancelled=False).exists()
     if existing:
         messages.info(request, 'You are already registered for this event.')
         return redirect('events:event_detail', slug=slug)
+    if event.is_sold_out:
+        messages.error(request, 'Sorry, this event is sold out.')
+        return redirect('events:event_detail', slug=slug)
 
     if request.method == 'POST':
         form = RegistrationForm(request.POST)
@@ -74,14 +225,20 @@ def register_event(request, slug):
             reg = form.save(commit=False)
             reg.user = request.user
             reg.event = event
-            reg.save()
-            # send confirmation email
-            send_mail(
+            try:
+                booking.register(reg)
+            except booking.AlreadyRegistered:
+                messages.info(request, 'You are already registered for this event.')
+                return redirect('events:event_detail', slug=slug)
+            except booking.SoldOut:
+                messages.error(request, 'Sorry, this event is sold out.')
+                return redirect('events:event_detail', slug=slug)
+            # queue confirmation email for the send_queued_mail worker
+            outbox.queue_mail(
                 'Registered Successfully',
                 f'You are registered for {event.title}.',
                 'no-reply@example.com',
-                [reg.email],
-                fail_silently=True,
+                [reg.email or request.user.email],
             )
             messages.success(request, 'Registered successfully. Confirmation email sent.')
             return redirect('events:profile')
@@ -91,6 +248,15 @@ def register_event(request, slug):
     return render(request, 'events/register.html', {'event': event, 'form': form})
 
 
+@login_required
+@require_http_methods(["POST"])
+def cancel_registration(request, pk):
+    reg = get_object_or_404(Registration, pk=pk, user=request.user)
+    if booking.cancel(reg):
+        messages.success(request, f'Your booking for {reg.event.title} was cancelled.')
+    return redirect('events:profile')
+
+
 def signup_view(request):
     if request.method == 'POST':
         user_form = SignupForm(request.POST)
@@ -158,9 +324,28 @@ def logout_view(request):
 
 @login_required
 def profile_view(request):
-    regs = Registration.objects.filter(user=request.user)
-    wishlist = []
-    return render(request, 'events/profile.html', {'regs': regs, 'wishlist': wishlist})
+    regs = Registration.objects.filter(user=request.user).select_related('event').order_by('-created_at')
+    return render(request, 'events/profile.html', {'regs': regs, 'wishlist': wishlist.entries(request.user)})
+
+
+@login_required
+@require_http_methods(["POST"])
+def toggle_wishlist(request, slug):
+    event = get_object_or_404(Event.objects.only('id', 'slug'), slug=slug)
+    # Forms post the state they want, so a double click cannot undo itself.
+    action = request.POST.get('action')
+    if action not in ('add', 'remove'):
+        action = 'remove' if event.pk in wishlist.saved_ids(request) else 'add'
+    if action == 'add':
+        wishlist.add(request.user, event)
+    else:
+        wishlist.remove(request.user, event)
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'saved': action == 'add'})
+    next_url = request.POST.get('next')
+    if next_url and url_has_allowed_host_and_scheme(next_url, {request.get_host()}, request.is_secure()):
+        return redirect(next_url)
+    return redirect('events:event_detail', slug=slug)
 
 
 def gallery_view(request):
@@ -183,14 +368,67 @@ def terms_view(request):
     return render(request, 'events/terms.html')
 
 
+def _organiser_allowed(request):
+    profile = getattr(request.user, 'profile', None)
+    return bool(profile and profile.is_organiser)
+
+
 def organiser_dashboard(request):
     if not request.user.is_authenticated:
         return redirect('events:login')
-    profile = getattr(request.user, 'profile', None)
-    if not profile or not profile.is_organiser:
+    if not _organiser_allowed(request):
+        return render(request, 'events/organiser_dashboard.html', {'allowed': False})
+    # Counts come from a single annotated query and only the newest few
+    # registrations per event are prefetched, so the number of queries does not
+    # grow with the number of events or registrations.
+    recent_regs = Registration.objects.order_by('-created_at', '-id')[:DASHBOARD_REGISTRATIONS_PREVIEW]
+    events = (
+        request.user.organised_events
+        .annotate(registration_count=Count('registration'))
+        .prefetch_related(Prefetch('registration_set', queryset=recent_regs, to_attr='recent_registrations'))
+        .order_by('-date', '-id')
+    )
+    page = Paginator(events, DASHBOARD_EVENTS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'events/organiser_dashboard.html', {'allowed': True, 'events': page, 'page_obj': page})
+
+
+def organiser_event_registrations(request, slug):
+    if not request.user.is_authenticated:
+        return redirect('events:login')
+    if not _organiser_allowed(request):
         return render(request, 'events/organiser_dashboard.html', {'allowed': False})
-    events = request.user.organised_events.all()
-    return render(request, 'events/organiser_dashboard.html', {'allowed': True, 'events': events})
+    event = get_object_or_404(Event, slug=slug, organiser=request.user)
+    regs = event.registration_set.order_by('-created_at', '-id')
+    page = Paginator(regs, REGISTRATIONS_PER_PAGE).get_page(request.GET.get('page'))
+    return render(request, 'events/organiser_registrations.html', {'event': event, 'regs': page, 'page_obj': page})
+
+
+def _export_response(request, queryset, filename):
+    fmt = request.GET.get('format', 'csv')
+    if fmt not in exporter.FORMATS:
+        return HttpResponse('Unsupported export format.', status=400)
+    rows = exporter.registration_rows(queryset.order_by('event', '-created_at', '-id'))
+    response = StreamingHttpResponse(exporter.stream(rows, fmt), content_type=exporter.FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{fmt}"'
+    return response
+
+
+def export_event_registrations(request, slug):
+    if not request.user.is_authenticated:
+        return redirect('events:login')
+    if not _organiser_allowed(request):
+        return render(request, 'events/organiser_dashboard.html', {'allowed': False})
+    event = get_object_or_404(Event, slug=slug, organiser=request.user)
+    return _export_response(request, event.registration_set.all(), f'{event.slug}-registrations')
+
+
+def export_all_registrations(request):
+    if not request.user.is_authenticated:
+        return redirect('events:login')
+    if not _organiser_allowed(request):
+        return render(request, 'events/organiser_dashboard.html', {'allowed': False})
+    regs = Registration.objects.filter(event__organiser=request.user)
+    return _export_response(request, regs, 'registrations')
 
 
 @login_required
@@ -209,74 +447,68 @@ def create_event(request):
     return render(request, 'events/create_event.html', {'form': form})
 
 
+def audience_count(request):
+    """JSON count of users matching ?city=&any=tech,music&all=... for organisers."""
+    if not request.user.is_authenticated or not _organiser_allowed(request):
+        return JsonResponse({'error': 'Organisers only'}, status=403)
+    filters = {
+        'city': request.GET.get('city', '').strip(),
+        'any_of': request.GET.get('any', ''),
+        'all_of': request.GET.get('all', ''),
+    }
+    try:
+        total = audience.count(**filters)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse({**filters, 'count': total})
+
+
+@login_required
+def import_events(request):
+    if not _organiser_allowed(request):
+        return render(request, 'events/organiser_dashboard.html', {'allowed': False})
+    report = None
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if upload is None:
+            messages.error(request, 'Choose a CSV or JSON-lines file to upload.')
+        else:
+            try:
+                fmt = importer.detect_format(upload.name)
+                report = importer.import_file(
+                    upload.file, fmt, request.user,
+                    publish=request.POST.get('publish', '1') == '1',
+                    dry_run=bool(request.POST.get('dry_run')),
+                )
+            except importer.ImportFormatError as e:
+                messages.error(request, str(e))
+            else:
+                telemetry.emit('events.imported', rows=report.rows, created=report.created, errors=report.error_count)
+    return render(request, 'events/import_events.html', {'report': report, 'fields': EventForm.Meta.fields})
+
+
 # Chatbot views
 @csrf_exempt
 @require_http_methods(["POST"])
 def chatbot_response(request):
     """API endpoint for chatbot responses"""
-    # #region agent log - Log at the VERY start, before any try/except
-    try:
-        from pathlib import Path
-        import time as _t
-        LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-        LOG_FILE = LOG_DIR / 'debug.log'
-        LOG_DIR.mkdir(parents=True, exist_ok=True)
-        with open(LOG_FILE, 'a', encoding='utf-8') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"F","location":"views.py:217","message":"chatbot_response() ENTRY","data":{"method":request.method,"path":getattr(request, "path", None),"content_type":request.META.get("CONTENT_TYPE"),"body_length":len(request.body) if hasattr(request, 'body') else 0}, "timestamp":int(_t.time()*1000)})+'\n')
-    except Exception as log_err:
-        pass  # Don't let logging break the view
-    # #endregion
-    
+    limited = _rate_limited(request)
+    if limited is not None:
+        return limited
     try:
         data = json.loads(request.body)
         user_message = data.get('message', '').strip()
         
-        # #region agent log
-        try:
-            from pathlib import Path
-            import time as _t
-            LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-            LOG_FILE = LOG_DIR / 'debug.log'
-            LOG_DIR.mkdir(parents=True, exist_ok=True)
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"F","location":"views.py:230","message":"Parsed request body","data":{"user_message_length":len(user_message),"has_message":bool(user_message)}, "timestamp":int(_t.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
-        
         if not user_message:
             return JsonResponse({'error': 'Empty message'}, status=400)
         
-        # Initialize chatbot
-        chatbot = EventsChatbot()
-
-        # #region agent log
-        try:
-            from pathlib import Path
-            import time as _t
-            LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-            LOG_FILE = LOG_DIR / 'debug.log'
-            LOG_DIR.mkdir(parents=True, exist_ok=True)
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"F","location":"views.py:245","message":"Calling chatbot.get_response()","data":{"user_message_length":len(user_message)}, "timestamp":int(_t.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
+        # Initialize chatbot with this visitor's conversation so far
+        conversation = Conversation.load(request.session)
+        chatbot = EventsChatbot(conversation=conversation)
 
         response = chatbot.get_response(user_message)
-
-        # #region agent log
-        try:
-            from pathlib import Path
-            import time as _t
-            LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-            LOG_FILE = LOG_DIR / 'debug.log'
-            LOG_DIR.mkdir(parents=True, exist_ok=True)
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"F","location":"views.py:252","message":"chatbot.get_response() returned","data":{"response_length":len(response) if isinstance(response, str) else None,"response_startswith_sorry":(isinstance(response, str) and response.startswith("Sorry"))}, "timestamp":int(_t.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
+        conversation.save(request.session)
+        telemetry.emit('chatbot.request', path=request.path, message_length=len(user_message), response_length=len(response))
         
         return JsonResponse({
             'success': True,
@@ -285,33 +517,98 @@ def chatbot_response(request):
         })
     
     except json.JSONDecodeError as je:
-        # #region agent log
-        try:
-            from pathlib import Path
-            import time as _t
-            LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-            LOG_FILE = LOG_DIR / 'debug.log'
-            LOG_DIR.mkdir(parents=True, exist_ok=True)
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"F","location":"views.py:268","message":"JSONDecodeError","data":{"error":str(je)}, "timestamp":int(_t.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
+        telemetry.emit('chatbot.invalid_json', level='warning', error=str(je))
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
-        # #region agent log
-        try:
-            from pathlib import Path
-            import time as _t
-            LOG_DIR = Path('c:\\Users\\JOKER\\Desktop\\Book_my_event\\.cursor')
-            LOG_FILE = LOG_DIR / 'debug.log'
-            LOG_DIR.mkdir(parents=True, exist_ok=True)
-            with open(LOG_FILE, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run4","hypothesisId":"F","location":"views.py:277","message":"Exception in chatbot_response","data":{"error":str(e),"error_type":type(e).__name__}, "timestamp":int(_t.time()*1000)})+'\n')
-        except:
-            pass
-        # #endregion
+        telemetry.emit('chatbot.request_failed', level='error', error=str(e), error_type=type(e).__name__)
         return JsonResponse({
             'error': str(e),
             'success': False
         }, status=500)
+
+
+def _rate_limited(request):
+    """A 429 response when the client is over its chatbot rate limit, else None."""
+    retry_after = throttle.chatbot_retry_after(request)
+    if not retry_after:
+        return None
+    telemetry.emit('chatbot.rate_limited', level='warning', path=request.path, retry_after=round(retry_after, 1))
+    response = JsonResponse({
+        'error': 'You are sending messages too quickly. Please wait a moment and try again.',
+        'success': False,
+    }, status=429)
+    response['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_frames(chunks, on_done=None):
+    # An SSE comment flushes the headers straight away.
+    yield ': stream open\n\n'
+    for chunk in chunks:
+        yield _sse('message', {'delta': chunk})
+    if on_done is not None:
+        on_done()
+    yield _sse('done', {})
+
+
+async def _iterate_in_thread(iterator):
+    """Serve a blocking iterator to an ASGI server without blocking the event loop.
+
+    Each step runs on the request's own sync thread (thread_sensitive), so
+    database connections opened by the chatbot's lookups are the request's
+    and are closed with it.
+    """
+    next_item = sync_to_async(next)
+    try:
+        while True:
+            item = await next_item(iterator, None)
+            if item is None:
+                break
+            yield item
+    finally:
+        # A client that disconnects closes this generator; pass that on.
+        await sync_to_async(iterator.close)()
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def chatbot_stream(request):
+    """Streaming variant of chatbot_response using Server-Sent Events"""
+    limited = _rate_limited(request)
+    if limited is not None:
+        return limited
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    user_message = data.get('message', '').strip()
+    if not user_message:
+        return JsonResponse({'error': 'Empty message'}, status=400)
+
+    conversation = Conversation.load(request.session)
+    # Marks the session modified, so the middleware creates it and sets the
+    # cookie before the stream starts; remember() stores the new turn.
+    conversation.save(request.session)
+    try:
+        chatbot = EventsChatbot(conversation=conversation)
+    except Exception as e:
+        return JsonResponse({'error': str(e), 'success': False}, status=500)
+
+    def remember():
+        # SessionMiddleware saved the session before the body was generated.
+        conversation.save(request.session)
+        request.session.save()
+
+    frames = _sse_frames(chatbot.stream_response(user_message), on_done=remember)
+    # Each server type needs its own kind of iterator, or Django buffers the
+    # whole response before sending any of it.
+    if isinstance(request, ASGIRequest):
+        frames = _iterate_in_thread(frames)
+    response = StreamingHttpResponse(frames, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,65 @@
+"""Per-user wishlists ("saved" events).
+
+Pages show a saved badge on every event card, so membership has to be a set
+lookup rather than a query per card. ``saved_ids(request)`` loads the user's
+saved event ids once per request, from the default cache when possible, and
+keeps the frozenset on the request. Adding or removing an entry deletes the
+cached set (see signals.py).
+
+Writes are idempotent: ``add`` relies on the ``unique_wishlist_entry``
+constraint, so two concurrent clicks still leave a single row.
+"""
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .models import Wishlist
+
+CACHE_TIMEOUT = 15 * 60
+_REQUEST_ATTR = '_wishlist_ids'
+
+
+def cache_key(user_id):
+    return f'wishlist:{user_id}'
+
+
+def load_ids(user_id):
+    key = cache_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Wishlist.objects.filter(user_id=user_id).values_list('event_id', flat=True))
+        cache.set(key, ids, CACHE_TIMEOUT)
+    return ids
+
+
+def saved_ids(request):
+    """Event ids the request's user has saved; empty for anonymous users."""
+    ids = getattr(request, _REQUEST_ATTR, None)
+    if ids is None:
+        user = getattr(request, 'user', None)
+        ids = load_ids(user.pk) if user is not None and user.is_authenticated else frozenset()
+        setattr(request, _REQUEST_ATTR, ids)
+    return ids
+
+
+def invalidate(user_id):
+    cache.delete(cache_key(user_id))
+
+
+def add(user, event):
+    """Save ``event`` for ``user``. Returns False when it was already saved."""
+    try:
+        with transaction.atomic():
+            Wishlist.objects.create(user=user, event=event)
+    except IntegrityError:
+        return False
+    return True
+
+
+def remove(user, event):
+    """Returns False when ``event`` was not saved."""
+    deleted, _ = Wishlist.objects.filter(user=user, event=event).delete()
+    return bool(deleted)
+
+
+def entries(user):
+    return Wishlist.objects.filter(user=user).select_related('event').order_by('-added_at', '-pk')